@@ -1,36 +1,117 @@
 import os
+import functools
+from dataclasses import dataclass, field, fields
+from typing import Any, Optional
+
 from dotenv import load_dotenv
 
-# Load environment variables from the .env file in the project root
-load_dotenv()
+# The .env file only needs to be parsed once per process, even across reload()
+_DOTENV_LOADED = False
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Application configuration.
+
+    Each field is read from the environment variable of the same name in upper
+    case (e.g. gemini_api_key <- GEMINI_API_KEY); the defaults below apply when
+    the variable is not set.
+    """
+
+    # === AI Provider Selection ===
+    # Options: google, modelscope, dashscope
+    ai_provider: str = "google"
+
+    # === Google AI Configuration (existing) ===
+
+    # Gemini API for Text Generation
+    gemini_api_key: Optional[str] = field(default=None, repr=False)
+    gemini_model_name: str = "gemini-1.5-flash"  # Default model
+
+    # Imagen API for Image Generation
+    imagen_api_key: Optional[str] = field(default=None, repr=False)
+    imagen_model_name: str = "imagen-4.0-fast-generate-001"  # Default model
+
+    # === ModelScope API-Inference Configuration (new) ===
+    # 2000 free API calls per day
+    modelscope_api_key: Optional[str] = field(default=None, repr=False)
+    ms_text_model: str = "Qwen/Qwen2.5-Coder-32B-Instruct"
+    ms_image_model: str = "Qwen/Qwen-Image"  # Use FLUX for image generation
+    ms_enable_thinking: bool = False
+
+    # === DashScope/Alibaba Cloud Configuration (new) ===
+    dashscope_api_key: Optional[str] = field(default=None, repr=False)
+    qianwen_model_name: str = "qwen-plus"
+    wanxiang_model_name: str = "qwen-image"  # or "wanx-v1"
+
+    # === Service Configuration ===
+
+    # Xiaohongshu MCP Service
+    xhs_mcp_base_url: str = "http://localhost:18060"
+
+    # Pretty-print archived content.json files (compact by default)
+    xhs_human_readable: bool = False
+
+    # Let is_available() make a live API call instead of only checking the configuration
+    probe_network: bool = False
+
+    # Console log level: DEBUG, INFO, WARNING, ERROR
+    log_level: str = "INFO"
+
+    # Persistent LLM response cache for development runs (disabled when empty)
+    llm_cache_dir: str = ""
+    llm_cache_ttl: int = 86400  # seconds
+
+    def __post_init__(self):
+        # Environment values arrive as strings; coerce them to the declared types once
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if not isinstance(value, str):
+                continue
+            if f.type is bool:
+                object.__setattr__(self, f.name, value.lower() == "true")
+            elif f.type is int:
+                object.__setattr__(self, f.name, int(value))
+
+
+@functools.lru_cache(maxsize=1)
+def _load() -> Settings:
+    """
+    Read the configuration once per process.
+
+    The .env file is parsed and os.environ is scanned only on the first call;
+    later lookups are served from the frozen Settings instance.
+    """
+    global _DOTENV_LOADED
 
-# === AI Provider Selection ===
-# Options: google, modelscope, dashscope
-AI_PROVIDER = os.getenv("AI_PROVIDER", "google")
+    # Load environment variables from the .env file in the project root
+    if not _DOTENV_LOADED:
+        load_dotenv()
+        _DOTENV_LOADED = True
 
-# === Google AI Configuration (existing) ===
+    overrides = {
+        f.name: os.environ[f.name.upper()]
+        for f in fields(Settings)
+        if f.name.upper() in os.environ
+    }
+    return Settings(**overrides)
 
-# Gemini API for Text Generation
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-flash") # Default model
 
-# Imagen API for Image Generation
-IMAGEN_API_KEY = os.getenv("IMAGEN_API_KEY")
-IMAGEN_MODEL_NAME = os.getenv("IMAGEN_MODEL_NAME", "imagen-4.0-fast-generate-001") # Default model
+def get_settings() -> Settings:
+    """Return the cached configuration."""
+    return _load()
 
-# === ModelScope API-Inference Configuration (new) ===
-# 2000 free API calls per day
-MODELSCOPE_API_KEY = os.getenv("MODELSCOPE_API_KEY")
-MS_TEXT_MODEL = os.getenv("MS_TEXT_MODEL", "Qwen/Qwen2.5-Coder-32B-Instruct")
-MS_IMAGE_MODEL = os.getenv("MS_IMAGE_MODEL", "Qwen/Qwen-Image")  # Use FLUX for image generation
-MS_ENABLE_THINKING = os.getenv("MS_ENABLE_THINKING", "false").lower() == "true"
 
-# === DashScope/Alibaba Cloud Configuration (new) ===
-DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY")
-QIANWEN_MODEL_NAME = os.getenv("QIANWEN_MODEL_NAME", "qwen-plus")
-WANXIANG_MODEL_NAME = os.getenv("WANXIANG_MODEL_NAME", "qwen-image")  # or "wanx-v1"
+def reload() -> None:
+    """Drop the cached configuration so the next access re-reads the environment (used by tests)."""
+    _load.cache_clear()
 
-# === Service Configuration ===
 
-# Xiaohongshu MCP Service
-XHS_MCP_BASE_URL = os.getenv("XHS_MCP_BASE_URL", "http://localhost:18060")
+def __getattr__(name: str) -> Any:
+    # settings.gemini_api_key is served from the cached Settings instance; the
+    # upper-case names (settings.GEMINI_API_KEY) are kept as aliases.
+    try:
+        return getattr(_load(), name.lower())
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
@@ -1,90 +1,171 @@
 import os
+import re
+import asyncio
+import sys
 import json
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from services.service_factory import get_ai_service, get_available_services
 from services.publish_service import publish_note
+from services.pipeline import generate_notes
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+# Non-alphanumeric characters in folder names; \W keeps CJK letters, matching str.isalnum()
+_UNSAFE_CHARS_RE = re.compile(r'\W')
+
+@functools.lru_cache(maxsize=None)
+def _resolve_base_path(base_path: str) -> Path:
+    """Resolve the storage root once per run."""
+    return Path(base_path).resolve(strict=False)
+
 def create_storage_folder(base_path: str, topic: str) -> str:
     """
     Creates a unique, timestamped folder for storing the generated content.
     """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    sanitized_topic = "".join(c if c.isalnum() else "_" for c in topic)[:50] # Sanitize and truncate topic
+    sanitized_topic = _UNSAFE_CHARS_RE.sub("_", topic[:50]) # Sanitize and truncate topic
     folder_name = f"{timestamp}_{sanitized_topic}"
-    full_path = os.path.join(base_path, folder_name)
-    os.makedirs(full_path, exist_ok=True)
-    print(f"Created storage folder: {full_path}")
-    return full_path
+    full_path = _resolve_base_path(base_path) / folder_name
+    full_path.mkdir(parents=True, exist_ok=True)
+    logger.info("Created storage folder: %s", full_path)
+    return str(full_path)
 
 def save_content_locally(folder_path: str, content: dict):
     """
     Saves the generated text content to a local JSON file.
     """
     filepath = os.path.join(folder_path, "content.json")
+    # Serialize up front and write once instead of streaming many small chunks.
+    # The archive is compact unless XHS_HUMAN_READABLE is set for debugging.
+    if settings.xhs_human_readable:
+        serialized = json.dumps(content, ensure_ascii=False, indent=4)
+    else:
+        serialized = json.dumps(content, ensure_ascii=False, separators=(',', ':'))
+    data = serialized.encode('utf-8')
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(content, f, ensure_ascii=False, indent=4)
-        print(f"Content successfully saved to: {filepath}")
+        with open(filepath, 'wb', buffering=64 * 1024) as f:
+            f.write(data)
+        logger.info("Content successfully saved to: %s", filepath)
     except IOError as e:
-        print(f"Error saving content locally: {e}")
+        logger.error("Error saving content locally: %s", e)
+
+def _prepare_note_folder(topic: str, content: dict) -> str:
+    """
+    Creates the storage folder for a note and archives its text content there.
+    """
+    storage_path = create_storage_folder("data", topic)
+    save_content_locally(storage_path, content)
+    return storage_path
+
+def run_batch(ai_service, topics: list[str]):
+    """
+    Generates notes for several topics through the staged pipeline, then publishes them in order.
+    """
+    logger.info("Generating %s notes...", len(topics))
+    results = asyncio.run(generate_notes(ai_service, topics, _prepare_note_folder))
+
+    published = 0
+    for result in results:
+        if not result.content or not result.image_paths:
+            logger.error("Skipping '%s': generation failed.", result.topic)
+            continue
+        logger.info("Publishing '%s' to Xiaohongshu...", result.topic)
+        if publish_note(
+            title=result.content['title'],
+            content=result.content['content'],
+            tags=result.content['tags'],
+            local_image_paths=result.image_paths
+        ):
+            published += 1
+
+    logger.info("--- Batch Complete: %s/%s notes published. ---", published, len(topics))
+
+def setup_logging():
+    """
+    Configure console logging for the CLI.
+
+    Output keeps the previous "[LEVEL] message" look on stdout; LOG_LEVEL=DEBUG
+    shows raw model responses, WARNING hides the step-by-step progress.
+    """
+    logging.basicConfig(
+        level=settings.log_level.upper(),
+        format="[%(levelname)s] %(message)s",
+        stream=sys.stdout,
+    )
 
 def main():
     """
     The main workflow for the xhs-ai-auto assistant.
     """
-    print("--- Welcome to the XHS AI Auto Assistant ---")
-    print(f"[INFO] Using AI Provider: {settings.AI_PROVIDER.upper()}")
+    logger.info("--- Welcome to the XHS AI Auto Assistant ---")
+    logger.info("Using AI Provider: %s", settings.ai_provider.upper())
 
     # Initialize AI service
     try:
         ai_service = get_ai_service()
-        print(f"[INFO] Successfully initialized {ai_service.get_service_name()} service")
+        logger.info("Successfully initialized %s service", ai_service.get_service_name())
     except ValueError as e:
-        print(f"[ERROR] Failed to initialize AI service: {e}")
+        logger.error("Failed to initialize AI service: %s", e)
         available = get_available_services()
         if available:
-            print(f"[INFO] Available services: {', '.join(available)}")
-            print("[INFO] Please check your .env configuration")
+            logger.info("Available services: %s", ', '.join(available))
+            logger.info("Please check your .env configuration")
         else:
-            print("[ERROR] No AI services are available. Please configure at least one service.")
+            logger.error("No AI services are available. Please configure at least one service.")
+        return
+
+    # Topics given on the command line are generated as one batch
+    topics = [topic for topic in sys.argv[1:] if topic.strip()]
+    if topics:
+        run_batch(ai_service, topics)
         return
 
     # 1. Get user input for the note topic
     topic = input("Please enter the topic for your Xiaohongshu note: ")
     if not topic:
-        print("Topic cannot be empty. Exiting.")
+        logger.warning("Topic cannot be empty. Exiting.")
         return
 
-    # 2. Create a local folder to store and archive all assets for this run
-    storage_path = create_storage_folder("data", topic)
+    # The API calls below are network-bound, so local disk work runs alongside them
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # 2. Generate text content
+        logger.info("Step 1: Generating text content...")
+        text_future = executor.submit(ai_service.generate_text_content, topic)
 
-    # 3. Generate text content
-    print("\nStep 1: Generating text content...")
-    text_content = ai_service.generate_text_content(topic)
-    if not text_content:
-        print("Failed to generate text content. Aborting.")
-        return
-    print("Text content generated successfully.")
-    save_content_locally(storage_path, text_content) # Archive the text content
-
-    # 4. Generate images and save them directly to the storage path
-    print("\nStep 2: Generating images...")
-    # Use image_prompt if available, otherwise fall back to content
-    image_prompt = text_content.get('image_prompt')
-    local_image_paths = ai_service.generate_images(
-        text_content=text_content['content'],
-        save_dir=storage_path, # Provide the directory to save images
-        num_images=1,
-        image_prompt=image_prompt  # Pass the specialized image prompt if available
-    )
+        # 3. Meanwhile, create a local folder to store and archive all assets for this run
+        storage_path = create_storage_folder("data", topic)
+
+        text_content = text_future.result()
+        if not text_content:
+            logger.error("Failed to generate text content. Aborting.")
+            return
+        logger.info("Text content generated successfully.")
+
+        # 4. Generate images and save them directly to the storage path
+        logger.info("Step 2: Generating images...")
+        # Use image_prompt if available, otherwise fall back to content
+        image_prompt = text_content.get('image_prompt')
+        images_future = executor.submit(
+            ai_service.generate_images,
+            text_content=text_content['content'],
+            save_dir=storage_path, # Provide the directory to save images
+            num_images=1,
+            image_prompt=image_prompt  # Pass the specialized image prompt if available
+        )
+        save_content_locally(storage_path, text_content) # Archive the text content while images generate
+        local_image_paths = images_future.result()
     if not local_image_paths:
-        print("Failed to generate images. Aborting.")
+        logger.error("Failed to generate images. Aborting.")
         return
-    print("Images generated and saved successfully.")
+    logger.info("Images generated and saved successfully.")
 
     # 5. Publish the note using the generated content and local image paths
-    print("\\nStep 3: Publishing to Xiaohongshu...")
+    logger.info("Step 3: Publishing to Xiaohongshu...")
     success = publish_note(
         title=text_content['title'],
         content=text_content['content'],
@@ -93,9 +174,10 @@ def main():
     )
 
     if success:
-        print("\\n--- Workflow Complete: Note published successfully! ---")
+        logger.info("--- Workflow Complete: Note published successfully! ---")
     else:
-        print("\\n--- Workflow Failed: Could not publish the note. ---")
+        logger.error("--- Workflow Failed: Could not publish the note. ---")
 
 if __name__ == '__main__':
+    setup_logging()
     main()
@@ -3,8 +3,18 @@ Abstract interface for AI services.
 This module defines the base interface that all AI service implementations must follow.
 """
 
+import asyncio
+import json
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Type
+
+from services import fast_json
+
+# Shared decoder for raw_decode, which parses one value from a given offset
+_JSON_DECODER = json.JSONDecoder()
+
+# Keys every generated note must contain
+REQUIRED_CONTENT_KEYS = ('title', 'content', 'tags')
 
 
 class AIService(ABC):
@@ -53,6 +63,48 @@ class AIService(ABC):
         """
         pass
 
+    async def agenerate_text_content(self, prompt: str) -> Dict:
+        """
+        Async variant of generate_text_content.
+
+        The default runs the blocking implementation in a worker thread so it does
+        not stall the event loop; providers with native async clients override it.
+        """
+        return await asyncio.to_thread(self.generate_text_content, prompt)
+
+    async def agenerate_images(self, text_content: str, save_dir: str, num_images: int = 1, image_prompt: Optional[str] = None) -> List[str]:
+        """
+        Async variant of generate_images; runs in a worker thread by default.
+        """
+        return await asyncio.to_thread(self.generate_images, text_content, save_dir, num_images, image_prompt)
+
+    def generate_post(self, prompt: str, save_dir: str, num_images: int = 1) -> Dict:
+        """
+        Generate a complete note: text content plus images for it.
+
+        The text call already returns an image_prompt, which is handed to
+        generate_images so providers skip their own prompt-rewriting step.
+
+        Args:
+            prompt: The topic or prompt for content generation
+            save_dir: Directory to save generated images
+            num_images: Number of images to generate (default: 1)
+
+        Returns:
+            The content dict with an added "image_paths" list, or {} if text generation failed
+        """
+        content = self.generate_text_content(prompt)
+        if not content:
+            return {}
+
+        content['image_paths'] = self.generate_images(
+            text_content=content['content'],
+            save_dir=save_dir,
+            num_images=num_images,
+            image_prompt=content.get('image_prompt'),
+        )
+        return content
+
     def get_service_name(self) -> str:
         """
         Get the name of the AI service provider.
@@ -60,4 +112,89 @@ class AIService(ABC):
         Returns:
             Service provider name
         """
-        return self.__class__.__name__.replace('AIService', '')
\ No newline at end of file
+        return self.__class__.__name__.replace('AIService', '')
+
+    def _extract_json(self, text: str) -> Optional[Dict]:
+        """
+        Decode the JSON object in a model response.
+
+        Clean responses are parsed directly; only otherwise is the text
+        searched for an embedded object (see decode_json_object).
+
+        Returns:
+            The decoded object, or None if the response contains no JSON object
+        """
+        try:
+            content = fast_json.loads(text)
+            if isinstance(content, dict):
+                return content
+        except fast_json.JSONDecodeError:
+            pass
+
+        return decode_json_object(text)
+
+    def _validate_content(self, content: Optional[Dict]) -> Optional[Dict]:
+        """
+        Check that parsed content has the required note fields.
+
+        Returns:
+            The content with its title truncated to 20 characters, or None if invalid
+        """
+        if not isinstance(content, dict) or not all(k in content for k in REQUIRED_CONTENT_KEYS):
+            return None
+
+        # Ensure title is within limit
+        content['title'] = content['title'][:20]
+        # image_prompt is optional, so we don't require it
+        return content
+
+
+def decode_json_object(text: str) -> Optional[Dict]:
+    """
+    Decode the first JSON object embedded in text, e.g. one wrapped in markdown
+    fences, commentary, or a thinking-mode preamble that itself contains braces.
+
+    raw_decode is tried from each '{' in turn: it parses a single value and
+    ignores whatever follows, so there is no regex backtracking, and stray
+    braces before the real object are skipped instead of breaking the parse.
+
+    Returns:
+        The decoded object, or None if the text contains no valid JSON object
+    """
+    start = text.find('{')
+    while start != -1:
+        try:
+            content, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(content, dict):
+                return content
+        except json.JSONDecodeError:
+            pass
+        start = text.find('{', start + 1)
+    return None
+
+
+# Provider name -> AIService implementation, filled in by @register
+_PROVIDERS: Dict[str, Type[AIService]] = {}
+
+
+def register(name: str) -> Callable[[Type[AIService]], Type[AIService]]:
+    """
+    Class decorator that registers an AIService implementation under a provider name.
+
+    Args:
+        name: Provider name as used in the AI_PROVIDER setting
+    """
+    def decorator(cls: Type[AIService]) -> Type[AIService]:
+        _PROVIDERS[name] = cls
+        return cls
+    return decorator
+
+
+def get_service_class(name: str) -> Type[AIService]:
+    """
+    Look up a registered AIService implementation.
+
+    Raises:
+        KeyError: If no implementation is registered under this name
+    """
+    return _PROVIDERS[name]
@@ -3,53 +3,104 @@ DashScope (Alibaba Cloud Model Studio) service implementation.
 Provides access to Qwen and Wanxiang models with free tier quotas.
 """
 
+import logging
 import os
+import functools
+import importlib.util
 import json
 import re
 import time
 import requests
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Dict, List, Optional
 from datetime import datetime
-from io import BytesIO
-from PIL import Image
 
 from config import settings
-from services.ai_service import AIService
+from services.ai_service import AIService, register
+from services.network import download_image, make_session
 
-try:
+logger = logging.getLogger(__name__)
+
+# Checking for the package does not import it; the SDK is loaded on first use.
+DASHSCOPE_AVAILABLE = importlib.util.find_spec("dashscope") is not None
+if not DASHSCOPE_AVAILABLE:
+    logger.warning("dashscope not installed. Run: pip install dashscope")
+
+# Image URLs in Qwen-Image text output
+_URL_RE = re.compile(r'https?://\S+')
+
+# System prompt for Xiaohongshu content; kept byte-identical across calls
+_XHS_SYSTEM_PROMPT = """你是一个专业的小红书内容创作助手。
+你需要根据用户提供的主题，生成符合小红书风格的内容。
+输出必须是一个有效的JSON对象，格式如下：
+{
+  "title": "吸引眼球的标题（最多20字）",
+  "content": "详细内容（300-500字，包含emoji，实用性强）",
+  "tags": ["标签1", "标签2", "标签3"],
+  "image_prompt": "图片生成提示词（50-150字，描述场景、风格、色调、构图）"
+}
+
+要求：
+1. 标题要吸引人，使用数字、emoji等元素
+2. 内容要分段，使用emoji装饰，提供实用价值
+3. 标签要精准，3-5个相关标签
+4. image_prompt要详细描述视觉元素，包括场景、风格、色调等"""
+
+# Async task polling (seconds)
+_POLL_INITIAL_DELAY = 0.5
+_POLL_MAX_DELAY = 8.0
+_POLL_TIMEOUT = 60.0
+
+
+@functools.cache
+def _dashscope():
+    """Load the dashscope SDK (heavy, pulls in its own HTTP stack) lazily."""
     import dashscope
-    from dashscope import Generation, ImageSynthesis, MultiModalConversation
-    DASHSCOPE_AVAILABLE = True
-except ImportError:
-    DASHSCOPE_AVAILABLE = False
-    print("[WARNING] dashscope not installed. Run: pip install dashscope")
+    return dashscope
 
 
+@register("dashscope")
 class DashScopeAIService(AIService):
     """DashScope/Alibaba Cloud Model Studio service implementation."""
 
+    # Shared by all instances so image downloads reuse pooled connections
+    _session: ClassVar[requests.Session] = make_session()
+
     def __init__(self):
         """Initialize DashScope service with API credentials."""
-        self.api_key = settings.DASHSCOPE_API_KEY
-        self.text_model = settings.QIANWEN_MODEL_NAME
-        self.image_model = settings.WANXIANG_MODEL_NAME
+        self.api_key = settings.dashscope_api_key
+        self.text_model = settings.qianwen_model_name
+        self.image_model = settings.wanxiang_model_name
 
+    def _sdk(self):
+        """Return the dashscope module with this service's API key applied."""
+        dashscope = _dashscope()
         # Set API key globally for dashscope
-        if DASHSCOPE_AVAILABLE and self.api_key:
+        if self.api_key:
             dashscope.api_key = self.api_key
+        return dashscope
 
-    def is_available(self) -> bool:
-        """Check if DashScope service is properly configured."""
+    @functools.cached_property
+    def _availability(self) -> bool:
+        """Configuration check, evaluated (and warned about) once per instance."""
         if not DASHSCOPE_AVAILABLE:
-            print("[ERROR] DashScope SDK not installed")
+            logger.error("DashScope SDK not installed")
             return False
 
         if not self.api_key:
-            print("[WARNING] DASHSCOPE_API_KEY is not configured")
+            logger.warning("DASHSCOPE_API_KEY is not configured")
             return False
 
         return True
 
+    def is_available(self) -> bool:
+        """Check if DashScope service is properly configured."""
+        return self._availability
+
+    def invalidate_availability(self) -> None:
+        """Forget the cached availability so the next check re-evaluates it (used by tests)."""
+        self.__dict__.pop('_availability', None)
+
     def generate_text_content(self, prompt: str) -> Dict:
         """
         Generate text content using Tongyi Qianwen model.
@@ -64,32 +115,15 @@ class DashScopeAIService(AIService):
             return {}
 
         try:
-            print(f"[INFO] Using DashScope model: {self.text_model}")
-
-            # System prompt for Xiaohongshu content
-            system_message = """你是一个专业的小红书内容创作助手。
-你需要根据用户提供的主题，生成符合小红书风格的内容。
-输出必须是一个有效的JSON对象，格式如下：
-{
-  "title": "吸引眼球的标题（最多20字）",
-  "content": "详细内容（300-500字，包含emoji，实用性强）",
-  "tags": ["标签1", "标签2", "标签3"],
-  "image_prompt": "图片生成提示词（50-150字，描述场景、风格、色调、构图）"
-}
-
-要求：
-1. 标题要吸引人，使用数字、emoji等元素
-2. 内容要分段，使用emoji装饰，提供实用价值
-3. 标签要精准，3-5个相关标签
-4. image_prompt要详细描述视觉元素，包括场景、风格、色调等"""
+            logger.info("Using DashScope model: %s", self.text_model)
 
             messages = [
-                {"role": "system", "content": system_message},
+                {"role": "system", "content": _XHS_SYSTEM_PROMPT},
                 {"role": "user", "content": f"请为以下主题创作小红书内容：{prompt}"}
             ]
 
             # Call Qianwen API
-            response = Generation.call(
+            response = self._sdk().Generation.call(
                 model=self.text_model,
                 messages=messages,
                 result_format='message',
@@ -99,14 +133,14 @@ class DashScopeAIService(AIService):
 
             if response.status_code == 200:
                 content = response.output.choices[0].message.content
-                print(f"[DEBUG] Generated content: {content[:200]}...")
+                logger.debug("Generated content: %s...", content[:200])
                 return self._parse_json_response(content)
             else:
-                print(f"[ERROR] Text generation failed: {response.code} - {response.message}")
+                logger.error("Text generation failed: %s - %s", response.code, response.message)
                 return {}
 
         except Exception as e:
-            print(f"[ERROR] DashScope text generation error: {e}")
+            logger.error("DashScope text generation error: %s", e)
             return {}
 
     def generate_images(self, text_content: str, save_dir: str, num_images: int = 1, image_prompt: Optional[str] = None) -> List[str]:
@@ -125,15 +159,15 @@ class DashScopeAIService(AIService):
             return []
 
         try:
-            print(f"[INFO] Generating images with model: {self.image_model}")
+            logger.info("Generating images with model: %s", self.image_model)
 
             # Use provided image_prompt if available, otherwise generate one
             if image_prompt:
                 final_prompt = image_prompt
-                print(f"[INFO] Using provided image prompt: {final_prompt[:100]}...")
+                logger.info("Using provided image prompt: %s...", final_prompt[:100])
             else:
                 final_prompt = self._generate_image_prompt(text_content)
-                print(f"[INFO] Generated image prompt: {final_prompt[:100]}...")
+                logger.info("Generated image prompt: %s...", final_prompt[:100])
 
             saved_paths = []
 
@@ -148,7 +182,7 @@ class DashScopeAIService(AIService):
             return saved_paths
 
         except Exception as e:
-            print(f"[ERROR] DashScope image generation error: {e}")
+            logger.error("DashScope image generation error: %s", e)
             return []
 
     def _generate_with_qwen_image(self, prompt: str, save_dir: str, num_images: int) -> List[str]:
@@ -164,7 +198,7 @@ class DashScopeAIService(AIService):
             ]
 
             # Call Qwen-Image API
-            response = MultiModalConversation.call(
+            response = self._sdk().MultiModalConversation.call(
                 model="qwen-image",
                 messages=messages,
                 result_format='message',
@@ -184,37 +218,29 @@ class DashScopeAIService(AIService):
 
                     # Look for image URLs in content
                     if isinstance(content, list):
-                        for item in content:
-                            if 'image' in item:
-                                url = item['image']
-                                path = self._download_and_save_image(url, save_dir, len(saved_paths))
-                                if path:
-                                    saved_paths.append(path)
+                        urls = [item['image'] for item in content if 'image' in item]
+                        saved_paths = self._download_images(urls, save_dir)
                     elif isinstance(content, str):
                         # Extract URLs from string
-                        import re
-                        urls = re.findall(r'https?://[^\s]+', content)
-                        for i, url in enumerate(urls[:num_images]):
-                            path = self._download_and_save_image(url, save_dir, i)
-                            if path:
-                                saved_paths.append(path)
-
-                print(f"[INFO] Generated {len(saved_paths)} images with Qwen-Image")
+                        urls = _URL_RE.findall(content)
+                        saved_paths = self._download_images(urls[:num_images], save_dir)
+
+                logger.info("Generated %s images with Qwen-Image", len(saved_paths))
                 return saved_paths
             else:
-                print(f"[ERROR] Qwen-Image failed: {response.code} - {response.message}")
+                logger.error("Qwen-Image failed: %s - %s", response.code, response.message)
                 return []
 
         except Exception as e:
-            print(f"[ERROR] Qwen-Image generation error: {e}")
+            logger.error("Qwen-Image generation error: %s", e)
             return []
 
     def _generate_with_wanxiang(self, prompt: str, save_dir: str, num_images: int) -> List[str]:
         """Generate images using Tongyi Wanxiang model."""
         try:
             # Call Wanxiang API (synchronous)
-            response = ImageSynthesis.call(
-                model=ImageSynthesis.Models.wanx_v1,
+            response = self._sdk().ImageSynthesis.call(
+                model=_dashscope().ImageSynthesis.Models.wanx_v1,
                 prompt=prompt,
                 n=num_images,
                 size='1024*1024',
@@ -222,35 +248,30 @@ class DashScopeAIService(AIService):
             )
 
             if response.status_code == 200:
-                saved_paths = []
-
                 # Save images from response
-                for i, result in enumerate(response.output.results):
-                    if hasattr(result, 'url'):
-                        path = self._download_and_save_image(result.url, save_dir, i)
-                        if path:
-                            saved_paths.append(path)
+                urls = [result.url for result in response.output.results if hasattr(result, 'url')]
+                saved_paths = self._download_images(urls, save_dir)
 
-                print(f"[INFO] Generated {len(saved_paths)} images with Wanxiang")
+                logger.info("Generated %s images with Wanxiang", len(saved_paths))
                 return saved_paths
             else:
-                print(f"[ERROR] Wanxiang failed: {response.code} - {response.message}")
+                logger.error("Wanxiang failed: %s - %s", response.code, response.message)
 
                 # Try async mode as fallback
                 return self._generate_with_wanxiang_async(prompt, save_dir, num_images)
 
         except Exception as e:
-            print(f"[ERROR] Wanxiang generation error: {e}")
+            logger.error("Wanxiang generation error: %s", e)
             return []
 
     def _generate_with_wanxiang_async(self, prompt: str, save_dir: str, num_images: int) -> List[str]:
         """Generate images using Wanxiang async mode."""
         try:
-            print("[INFO] Using async mode for Wanxiang")
+            logger.info("Using async mode for Wanxiang")
 
             # Submit async task
-            response = ImageSynthesis.async_call(
-                model=ImageSynthesis.Models.wanx_v1,
+            response = self._sdk().ImageSynthesis.async_call(
+                model=_dashscope().ImageSynthesis.Models.wanx_v1,
                 prompt=prompt,
                 n=num_images,
                 size='1024*1024'
@@ -258,56 +279,49 @@ class DashScopeAIService(AIService):
 
             if response.status_code == 200:
                 task_id = response.output.task_id
-                print(f"[INFO] Task submitted: {task_id}")
+                logger.info("Task submitted: %s", task_id)
 
-                # Poll for results
-                max_attempts = 30
-                for attempt in range(max_attempts):
-                    time.sleep(2)  # Wait 2 seconds between polls
+                # Poll for results, backing off from 0.5s up to 8s within a 60s budget
+                deadline = time.monotonic() + _POLL_TIMEOUT
+                delay = _POLL_INITIAL_DELAY
+                attempt = 0
+                while time.monotonic() < deadline:
+                    time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+                    delay = min(delay * 2, _POLL_MAX_DELAY)
+                    attempt += 1
 
-                    status_response = ImageSynthesis.fetch(task_id)
+                    status_response = self._sdk().ImageSynthesis.fetch(task_id)
 
                     if status_response.status_code == 200:
                         if status_response.output.task_status == 'SUCCEEDED':
                             # Save images
-                            saved_paths = []
-                            for i, result in enumerate(status_response.output.results):
-                                if hasattr(result, 'url'):
-                                    path = self._download_and_save_image(result.url, save_dir, i)
-                                    if path:
-                                        saved_paths.append(path)
-
-                            print(f"[SUCCESS] Async generation completed")
+                            urls = [result.url for result in status_response.output.results if hasattr(result, 'url')]
+                            saved_paths = self._download_images(urls, save_dir)
+
+                            logger.info("Async generation completed")
                             return saved_paths
                         elif status_response.output.task_status == 'FAILED':
-                            print("[ERROR] Task failed")
+                            logger.error("Task failed")
                             return []
 
-                    print(f"[INFO] Polling attempt {attempt+1}/{max_attempts}...")
+                    logger.info("Polling attempt %s, task still running...", attempt)
 
-                print("[ERROR] Timeout waiting for async task")
+                logger.error("Timeout waiting for async task")
                 return []
             else:
-                print(f"[ERROR] Async task submission failed: {response.code}")
+                logger.error("Async task submission failed: %s", response.code)
                 return []
 
         except Exception as e:
-            print(f"[ERROR] Wanxiang async error: {e}")
+            logger.error("Wanxiang async error: %s", e)
             return []
 
     def _parse_json_response(self, response_text: str) -> Dict:
         """Parse JSON from model response."""
         try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                content = json.loads(json_match.group(0))
-
-                # Validate required fields
-                if all(k in content for k in ['title', 'content', 'tags']):
-                    # Ensure title is within limit
-                    content['title'] = content['title'][:20]
-                    return content
+            content = self._validate_content(self._extract_json(response_text))
+            if content:
+                return content
 
             # Fallback: create content from response
             return self._create_fallback_content(response_text)
@@ -338,25 +352,30 @@ class DashScopeAIService(AIService):
 
         return prompt
 
-    def _download_and_save_image(self, img_url: str, save_dir: str, index: int) -> Optional[str]:
-        """Download and save image from URL."""
-        try:
-            print(f"[INFO] Downloading image from: {img_url[:50]}...")
-
-            response = requests.get(img_url, timeout=30)
-            if response.status_code == 200:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = os.path.join(save_dir, f"dashscope_image_{timestamp}_{index+1}.png")
+    def _download_images(self, urls: List[str], save_dir: str) -> List[str]:
+        """Download all image URLs concurrently and return the paths that were saved."""
+        if not urls:
+            return []
 
-                img = Image.open(BytesIO(response.content))
-                img.save(filename)
+        # Resolved and created once per batch, not per image
+        save_dir = os.path.abspath(save_dir)
+        os.makedirs(save_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            paths = executor.map(
+                lambda item: self._download_and_save_image(item[1], save_dir, item[0], timestamp),
+                enumerate(urls)
+            )
+            return [path for path in paths if path]
 
-                print(f"[SUCCESS] Image saved to: {filename}")
-                return os.path.abspath(filename)
-            else:
-                print(f"[ERROR] Failed to download image: {response.status_code}")
-                return None
+    def _download_and_save_image(self, img_url: str, save_dir: str, index: int, timestamp: str) -> Optional[str]:
+        """Download and save image from URL into save_dir (an absolute, existing directory)."""
+        try:
+            logger.info("Downloading image from: %s...", img_url[:50])
+            filename = download_image(self._session, img_url, os.path.join(save_dir, f"dashscope_image_{timestamp}_{index+1}"))
+            logger.info("Image saved to: %s", filename)
+            return filename
 
         except Exception as e:
-            print(f"[ERROR] Error downloading image {index+1}: {e}")
-            return None
\ No newline at end of file
+            logger.error("Error downloading image %s: %s", index+1, e)
+            return None
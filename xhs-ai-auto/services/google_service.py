@@ -3,38 +3,107 @@ Google AI service implementation (Gemini + Imagen).
 Refactored to implement the AIService interface.
 """
 
-from google import genai
-from google.genai import types
-from PIL import Image
-import json
-import re
+import logging
+import functools
 import os
 from datetime import datetime
 from io import BytesIO
+from pathlib import Path
 from typing import Dict, List, Optional
 
 from config import settings
-from services.ai_service import AIService
+from services.ai_service import AIService, register
+from services.llm_cache import get_cache, make_key, make_request_key
+from services.network import retry_transient, sniff_image_extension
 
+logger = logging.getLogger(__name__)
 
+# Static instructions for note generation; sent as the system instruction so the
+# request prefix is identical across topics
+_TEXT_SYSTEM_PROMPT = """You are a helpful assistant that strictly follows instructions. Your task is to generate content for a Xiaohongshu note.
+Your output MUST be a single, valid JSON object and nothing else. Do not include any text before or after the JSON object, such as markdown formatting.
+
+The JSON object must contain exactly these four keys: "title", "content", "tags", and "image_prompt".
+
+Here is an example of the required output format:
+{
+  "title": "Example Title",
+  "content": "This is an example note content with emojis ✨.",
+  "tags": ["example", "demo"],
+  "image_prompt": "A bright and warm home scene showcasing healthy lifestyle, soft natural lighting, minimalist style photography"
+}
+
+Requirements for each field:
+- title: Catchy title (max 20 characters)
+- content: Main content (300-500 characters, include emojis, practical)
+- tags: List of 3-5 relevant tags
+- image_prompt: Detailed visual description for image generation (50-150 characters, describe scene, style, colors, composition)
+
+Now, generate the content for the topic given by the user."""
+
+# Text shorter than this is used as the image prompt directly instead of being rewritten by Gemini
+_SHORT_TEXT_THRESHOLD = 120
+
+_IMAGE_PROMPT_TEMPLATE = 'You are an expert in visual art. Based on the text, create a concise, highly descriptive, and artistic prompt in English for an AI image model like Imagen. Focus on visual details, style, and lighting. The prompt should be a single, fluent sentence. Text: "{text}" '
+
+
+@functools.cache
+def _genai():
+    """Import the google-genai SDK on first use."""
+    from google import genai
+    return genai
+
+
+@functools.cache
+def _genai_types():
+    """Import the google-genai types module on first use."""
+    from google.genai import types
+    return types
+
+
+@register("google")
 class GoogleAIService(AIService):
     """Google AI service implementation using Gemini and Imagen."""
 
     def __init__(self):
         """Initialize Google AI service with API credentials."""
-        self.gemini_api_key = settings.GEMINI_API_KEY
-        self.imagen_api_key = settings.IMAGEN_API_KEY
-        self.gemini_model = settings.GEMINI_MODEL_NAME
-        self.imagen_model = settings.IMAGEN_MODEL_NAME
+        self.gemini_api_key = settings.gemini_api_key
+        self.imagen_api_key = settings.imagen_api_key
+        self.gemini_model = settings.gemini_model_name
+        self.imagen_model = settings.imagen_model_name
+
+        # Clients are created on first use and reused for every later call
+        self._gemini_client = None
+        self._imagen_client = None
+
+        # Repeated texts (retries, re-runs of a topic) reuse the optimized prompt
+        self._optimize_image_prompt = functools.lru_cache(maxsize=128)(self._request_image_prompt)
+
+    @property
+    def gemini_client(self):
+        """Shared Gemini client (created lazily)."""
+        if self._gemini_client is None:
+            self._gemini_client = _genai().Client(api_key=self.gemini_api_key)
+        return self._gemini_client
+
+    @property
+    def imagen_client(self):
+        """Shared Imagen client (created lazily, same as Gemini's when the keys match)."""
+        if self._imagen_client is None:
+            if self.imagen_api_key == self.gemini_api_key:
+                self._imagen_client = self.gemini_client
+            else:
+                self._imagen_client = _genai().Client(api_key=self.imagen_api_key)
+        return self._imagen_client
 
     def is_available(self) -> bool:
         """Check if Google AI service is properly configured."""
         if not self.gemini_api_key:
-            print("[WARNING] GEMINI_API_KEY is not configured")
+            logger.warning("GEMINI_API_KEY is not configured")
             return False
 
         if not self.imagen_api_key:
-            print("[WARNING] IMAGEN_API_KEY is not configured")
+            logger.warning("IMAGEN_API_KEY is not configured")
             return False
 
         return True
@@ -50,62 +119,45 @@ class GoogleAIService(AIService):
             Dict with title, content, and tags
         """
         if not self.gemini_api_key:
-            print("[ERROR] GEMINI_API_KEY is not configured")
+            logger.error("GEMINI_API_KEY is not configured")
             return {}
 
-        try:
-            print(f"[INFO] Using Gemini model: {self.gemini_model}")
-            client = genai.Client(api_key=self.gemini_api_key)
-
-            full_prompt = f"""
-            You are a helpful assistant that strictly follows instructions. Your task is to generate content for a Xiaohongshu note.
-            Your output MUST be a single, valid JSON object and nothing else. Do not include any text before or after the JSON object, such as markdown formatting.
-
-            The JSON object must contain exactly these four keys: "title", "content", "tags", and "image_prompt".
-
-            Here is an example of the required output format:
-            {{
-              "title": "Example Title",
-              "content": "This is an example note content with emojis ✨.",
-              "tags": ["example", "demo"],
-              "image_prompt": "A bright and warm home scene showcasing healthy lifestyle, soft natural lighting, minimalist style photography"
-            }}
+        cache = get_cache()
+        user_prompt = f'USER\'S TOPIC: "{prompt}"'
+        cache_key = make_request_key(self.gemini_model, [_TEXT_SYSTEM_PROMPT, user_prompt])
+        if cache:
+            cached = cache.get(cache_key)
+            if cached:
+                logger.info("Using cached Gemini response for this topic")
+                return cached
 
-            Requirements for each field:
-            - title: Catchy title (max 20 characters)
-            - content: Main content (300-500 characters, include emojis, practical)
-            - tags: List of 3-5 relevant tags
-            - image_prompt: Detailed visual description for image generation (50-150 characters, describe scene, style, colors, composition)
-
-            Now, generate the content for the following topic.
-
-            USER'S TOPIC: "{prompt}"
-            """
+        try:
+            logger.info("Using Gemini model: %s", self.gemini_model)
+            client = self.gemini_client
 
-            response = client.models.generate_content(
+            response = retry_transient(client.models.generate_content)(
                 model=self.gemini_model,
-                contents=full_prompt
+                contents=user_prompt,
+                config=_genai_types().GenerateContentConfig(system_instruction=_TEXT_SYSTEM_PROMPT)
             )
 
-            cleaned_response_text = re.search(r'\{[\s\S]*\}', response.text)
-            if not cleaned_response_text:
-                print("[ERROR] Could not find valid JSON in response")
-                print(f"[DEBUG] Raw response: {response.text[:200]}")
+            content = self._extract_json(response.text)
+            if content is None:
+                logger.error("Could not find valid JSON in response")
+                logger.debug("Raw response: %s", response.text[:200])
                 return {}
 
-            content = json.loads(cleaned_response_text.group(0))
-
-            if all(k in content for k in ['title', 'content', 'tags']):
-                # Ensure title is within limit
-                content['title'] = content['title'][:20]
-                # image_prompt is optional, so we don't require it
-                return content
-            else:
-                print("[ERROR] Response missing required keys")
+            validated = self._validate_content(content)
+            if validated is None:
+                logger.error("Response missing required keys")
                 return {}
 
+            if cache:
+                cache.set(cache_key, validated)
+            return validated
+
         except Exception as e:
-            print(f"[ERROR] Gemini text generation failed: {e}")
+            logger.error("Gemini text generation failed: %s", e)
             return {}
 
     def generate_images(self, text_content: str, save_dir: str, num_images: int = 1, image_prompt: Optional[str] = None) -> List[str]:
@@ -121,78 +173,95 @@ class GoogleAIService(AIService):
             List of saved image paths
         """
         if not self.imagen_api_key:
-            print("[ERROR] IMAGEN_API_KEY is not configured")
+            logger.error("IMAGEN_API_KEY is not configured")
             return []
 
         try:
-            print(f"[INFO] Using Imagen model: {self.imagen_model}")
-            client = genai.Client(api_key=self.imagen_api_key)
+            logger.info("Using Imagen model: %s", self.imagen_model)
+            client = self.imagen_client
 
             # Use provided image_prompt if available, otherwise use Gemini to generate one
             if image_prompt:
                 final_prompt = image_prompt
-                print(f"[INFO] Using provided image prompt: {final_prompt[:100]}...")
+                logger.info("Using provided image prompt: %s...", final_prompt[:100])
             else:
                 final_prompt = self._generate_image_prompt_with_gemini(text_content)
-                print(f"[INFO] Optimized image prompt: {final_prompt[:100]}...")
+                logger.info("Optimized image prompt: %s...", final_prompt[:100])
 
-            print(f"[INFO] Generating {num_images} image(s)...")
-            response = client.models.generate_images(
+            logger.info("Generating %s image(s)...", num_images)
+            response = retry_transient(client.models.generate_images)(
                 model=self.imagen_model,
                 prompt=final_prompt,
-                config=types.GenerateImagesConfig(number_of_images=num_images)
+                config=_genai_types().GenerateImagesConfig(number_of_images=num_images)
             )
 
-            print(f"[INFO] API call successful, processing images...")
+            logger.info("API call successful, processing images...")
 
             if hasattr(response, 'generated_images'):
-                print(f"[INFO] Number of generated images: {len(response.generated_images)}")
+                logger.info("Number of generated images: %s", len(response.generated_images))
             else:
-                print(f"[ERROR] Response does not have 'generated_images' attribute")
+                logger.error("Response does not have 'generated_images' attribute")
                 return []
 
+            # One timestamp per batch; the index keeps file names unique
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             saved_image_paths = []
             for i, img_data in enumerate(response.generated_images):
-                print(f"[INFO] Processing image {i+1}/{len(response.generated_images)}...")
+                logger.info("Processing image %s/%s...", i+1, len(response.generated_images))
 
                 try:
                     # Check the type of img_data.image
-                    print(f"[INFO] Image data type: {type(img_data.image).__name__}")
-
-                    # The response.generated_images[i].image might be a PIL Image object directly
-                    if isinstance(img_data.image, Image.Image):
-                        print(f"[INFO] Image is already a PIL Image object")
-                        img = img_data.image
-                    elif isinstance(img_data.image, bytes):
-                        print(f"[INFO] Image is raw bytes, converting to PIL Image")
-                        img = Image.open(BytesIO(img_data.image))
+                    logger.info("Image data type: %s", type(img_data.image).__name__)
+
+                    path_stem = os.path.join(save_dir, f"google_image_{timestamp}_{i+1}")
+
+                    # Imagen usually returns encoded PNG/JPEG bytes (directly or as types.Image.image_bytes)
+                    if isinstance(img_data.image, (bytes, bytearray)):
+                        raw_bytes = img_data.image
                     else:
-                        print(f"[WARNING] Unknown image type, attempting direct usage")
-                        img = img_data.image
+                        raw_bytes = getattr(img_data.image, 'image_bytes', None)
+                    extension = sniff_image_extension(raw_bytes)
 
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = os.path.join(save_dir, f"google_image_{timestamp}_{i+1}.png")
+                    if extension:
+                        filename = path_stem + extension
+                        logger.info("Image is already encoded, writing bytes directly to: %s", filename)
+                        Path(filename).write_bytes(raw_bytes)
+                    else:
+                        from PIL import Image
 
-                    print(f"[INFO] Saving image to: {filename}")
-                    img.save(filename)
+                        filename = path_stem + ".png"
+
+                        # The response.generated_images[i].image might be a PIL Image object directly
+                        if isinstance(img_data.image, Image.Image):
+                            logger.info("Image is already a PIL Image object")
+                            img = img_data.image
+                        elif isinstance(img_data.image, bytes):
+                            logger.info("Image is raw bytes, converting to PIL Image")
+                            img = Image.open(BytesIO(img_data.image))
+                        else:
+                            logger.warning("Unknown image type, attempting direct usage")
+                            img = img_data.image
+
+                        logger.info("Saving image to: %s", filename)
+                        img.save(filename)
 
                     saved_image_paths.append(os.path.abspath(filename))
-                    print(f"[SUCCESS] Image {i+1} saved successfully")
+                    logger.info("Image %s saved successfully", i+1)
 
                 except Exception as img_error:
-                    print(f"[ERROR] Failed to process image {i+1}: {img_error}")
+                    logger.error("Failed to process image %s: %s", i+1, img_error)
                     continue
 
-            print(f"[SUCCESS] Total images saved: {len(saved_image_paths)}")
+            logger.info("Total images saved: %s", len(saved_image_paths))
             return saved_image_paths
 
         except Exception as e:
-            print(f"[ERROR] Imagen generation failed: {e}")
-            print(f"[ERROR] Exception type: {type(e).__name__}")
+            logger.error("Imagen generation failed: %s", e)
+            logger.error("Exception type: %s", type(e).__name__)
 
             # Try to extract more error information
             if hasattr(e, '__dict__'):
-                print(f"[DEBUG] Error attributes: {e.__dict__}")
+                logger.debug("Error attributes: %s", e.__dict__)
 
             return []
 
@@ -201,16 +270,33 @@ class GoogleAIService(AIService):
         if not self.gemini_api_key:
             return f"A beautiful social media image about: {text_content[:100]}"
 
-        try:
-            client = genai.Client(api_key=self.gemini_api_key)
-            full_prompt = f"""You are an expert in visual art. Based on the text, create a concise, highly descriptive, and artistic prompt in English for an AI image model like Imagen. Focus on visual details, style, and lighting. The prompt should be a single, fluent sentence. Text: "{text_content[:300]}" """
-
-            response = client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=full_prompt
-            )
+        # Short text is already a usable prompt, skip the extra round-trip
+        if len(text_content) < _SHORT_TEXT_THRESHOLD:
+            return f"Social media photo, cinematic lighting: {text_content}"
 
-            return response.text.strip()
+        try:
+            return self._optimize_image_prompt(text_content[:300])
 
         except Exception:
-            return f"A beautiful social media image about: {text_content[:100]}"
\ No newline at end of file
+            return f"A beautiful social media image about: {text_content[:100]}"
+
+    def _request_image_prompt(self, text: str) -> str:
+        """Ask Gemini to rewrite the text as an image prompt (memoized in __init__)."""
+        cache = get_cache()
+        cache_key = make_key("gemini-image-prompt", "gemini-1.5-flash", text)
+        if cache:
+            cached = cache.get(cache_key)
+            if cached:
+                return cached
+
+        full_prompt = _IMAGE_PROMPT_TEMPLATE.format(text=text)
+
+        response = retry_transient(self.gemini_client.models.generate_content)(
+            model="gemini-1.5-flash",
+            contents=full_prompt
+        )
+
+        image_prompt = response.text.strip()
+        if cache:
+            cache.set(cache_key, image_prompt)
+        return image_prompt
@@ -0,0 +1,88 @@
+"""
+Persistent cache for LLM responses.
+Lets development and test runs reuse the answer for a prompt that was already sent,
+instead of calling the model again. Disabled unless LLM_CACHE_DIR is configured.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import shelve
+import threading
+import time
+from typing import Any, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """Shelve-backed key/value store whose entries expire after a TTL."""
+
+    def __init__(self, directory: str, ttl: int):
+        """
+        Args:
+            directory: Folder holding the cache database
+            ttl: Lifetime of an entry in seconds
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, "responses")
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock, shelve.open(self._path) as db:
+            entry = db.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value under the key."""
+        with self._lock, shelve.open(self._path) as db:
+            db[key] = (time.time() + self._ttl, value)
+
+
+def make_key(*parts: str) -> str:
+    """Build a cache key from the provider, model and prompt text."""
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def make_request_key(model: str, messages: Any, temperature: Optional[float] = None) -> str:
+    """
+    Build an exact-match cache key for a chat request.
+
+    Everything that changes the answer (model, system and user messages, temperature)
+    is part of the key, so editing a prompt template never serves stale responses.
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def get_cache() -> Optional[LLMCache]:
+    """
+    Get the process-wide response cache.
+
+    Returns:
+        LLMCache instance, or None if LLM_CACHE_DIR is not configured
+    """
+    if not settings.llm_cache_dir:
+        return None
+
+    directory = os.path.expanduser(settings.llm_cache_dir)
+    logger.info("LLM response cache enabled: %s", directory)
+    return LLMCache(directory, settings.llm_cache_ttl)
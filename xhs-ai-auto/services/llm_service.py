@@ -1,190 +1,497 @@
 from google import genai
 from google.genai import types
 from PIL import Image
-import json
-import re
+import asyncio
+import functools
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional
 from config import settings
 from io import BytesIO
+from services.ai_service import decode_json_object
+from services.llm_cache import get_cache, make_key, make_request_key
+from services.network import retry_transient, sniff_image_extension
+
+logger = logging.getLogger(__name__)
+
+
+# Imagen returns at most this many images per request
+_MAX_IMAGES_PER_REQUEST = 4
+
+# Static instructions, sent as the system instruction so every request shares the
+# same prefix (which the provider can cache); only the user turn carries the topic
+_TEXT_SYSTEM_PROMPT = """You are a helpful assistant that strictly follows instructions. Your task is to generate content for a Xiaohongshu note.
+Your output MUST be a single, valid JSON object and nothing else. Do not include any text before or after the JSON object, such as markdown formatting.
+
+The JSON object must contain exactly these four keys: "title", "content", "tags", and "image_prompt".
+"image_prompt" is a descriptive English prompt (at most 60 words) for an AI image model, covering the scene, style, lighting and composition of a picture for the note.
+
+Here is an example of the required output format:
+{
+  "title": "Example Title",
+  "content": "This is an example note content with emojis ✨.",
+  "tags": ["example", "demo"],
+  "image_prompt": "A bright and cozy home scene with a healthy breakfast on a wooden table, soft natural morning light, minimalist lifestyle photography"
+}
+
+Now, generate the content for the following topic."""
+
+_TEXT_USER_PROMPT_TEMPLATE = 'USER\'S TOPIC: "{prompt}"'
+
+_IMAGE_PROMPT_TEMPLATE = 'You are an expert in visual art. Based on the text, create a concise, highly descriptive, and artistic prompt in English for an AI image model like Imagen. Focus on visual details, style, and lighting. The prompt should be a single, fluent sentence. Text: "{text}"'
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str) -> genai.Client:
+    """
+    Returns a shared genai.Client for the given API key, so its HTTP session
+    and connections are reused across calls instead of rebuilt every time.
+    """
+    return genai.Client(api_key=api_key)
+
+def _parse_text_response(response_text: str) -> dict:
+    """
+    Extracts and validates the note JSON from a Gemini response. Returns {} if invalid.
+    """
+    content = decode_json_object(response_text)
+    if content is None:
+        logger.error("Could not find a valid JSON object in the model's response.")
+        logger.debug("Raw Gemini Response: %s", response_text)
+        return {}
+
+    if all(k in content for k in ['title', 'content', 'tags']):
+        return content
+    else:
+        logger.error("Gemini response is missing required keys.")
+        logger.error("Received JSON: %s", content)
+        return {}
+
+def _prepare_text_request(prompt: str) -> Optional[tuple]:
+    """
+    Shared setup of generate_text_content and agenerate_text_content.
+
+    Returns:
+        (client, generate_content keyword arguments, cache, cache key),
+        or None if no client could be created
+    """
+    if not settings.gemini_api_key:
+        logger.error("GEMINI_API_KEY is not configured in the .env file.")
+        return None
+    try:
+        client = _get_client(settings.gemini_api_key)
+    except Exception as e:
+        logger.error("Error initializing Gemini Client: %s", e)
+        return None
+
+    user_prompt = _TEXT_USER_PROMPT_TEMPLATE.format(prompt=prompt)
+    request = {
+        'model': settings.gemini_model_name,
+        'contents': user_prompt,
+        'config': types.GenerateContentConfig(system_instruction=_TEXT_SYSTEM_PROMPT),
+    }
+    cache_key = make_request_key(settings.gemini_model_name, [_TEXT_SYSTEM_PROMPT, user_prompt])
+    return client, request, get_cache(), cache_key
 
 def generate_text_content(prompt: str) -> dict:
     """
     Generates text content for a Xiaohongshu note using the Google Gemini API.
     This function now uses the correct genai.Client method.
     """
-    if not settings.GEMINI_API_KEY:
-        print("Error: GEMINI_API_KEY is not configured in the .env file.")
+    prepared = _prepare_text_request(prompt)
+    if prepared is None:
         return {}
+    client, request, cache, cache_key = prepared
+
+    cached = cache.get(cache_key) if cache else None
+    if cached:
+        logger.info("Using cached Gemini response for this topic.")
+        return cached
+
     try:
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        logger.info("Sending prompt to Gemini model: %s...", settings.gemini_model_name)
+        response = retry_transient(client.models.generate_content)(**request)
+        content = _parse_text_response(response.text)
     except Exception as e:
-        print(f"Error initializing Gemini Client: {e}")
+        logger.error("Error calling Gemini API: %s", e)
         return {}
 
-    full_prompt = f"""
-    You are a helpful assistant that strictly follows instructions. Your task is to generate content for a Xiaohongshu note.
-    Your output MUST be a single, valid JSON object and nothing else. Do not include any text before or after the JSON object, such as markdown formatting.
+    if content and cache:
+        cache.set(cache_key, content)
+    return content
 
-    The JSON object must contain exactly these three keys: "title", "content", and "tags".
+async def agenerate_text_content(prompt: str) -> dict:
+    """
+    Async variant of generate_text_content built on the SDK's asyncio client (client.aio),
+    so several notes can be generated concurrently, e.g. with asyncio.gather.
+    The response cache is file-backed, so it is read and written in a worker thread.
+    """
+    prepared = _prepare_text_request(prompt)
+    if prepared is None:
+        return {}
+    client, request, cache, cache_key = prepared
 
-    Here is an example of the required output format:
-    {{
-      "title": "Example Title",
-      "content": "This is an example note content with emojis ✨.",
-      "tags": ["example", "demo"]
-    }}
+    cached = await asyncio.to_thread(cache.get, cache_key) if cache else None
+    if cached:
+        logger.info("Using cached Gemini response for this topic.")
+        return cached
 
-    Now, generate the content for the following topic.
+    try:
+        logger.info("Sending prompt to Gemini model: %s...", settings.gemini_model_name)
+        response = await retry_transient(client.aio.models.generate_content)(**request)
+        content = _parse_text_response(response.text)
+    except Exception as e:
+        logger.error("Error calling Gemini API: %s", e)
+        return {}
 
-    USER'S TOPIC: "{prompt}"
-    """
+    if content and cache:
+        await asyncio.to_thread(cache.set, cache_key, content)
+    return content
 
-    try:
-        print(f"Sending prompt to Gemini model: {settings.GEMINI_MODEL_NAME}...")
-        response = client.models.generate_content(
-            model=settings.GEMINI_MODEL_NAME,
-            contents=full_prompt
-        )
-        cleaned_response_text = re.search(r'\{[\s\S]*\}', response.text)
-        if not cleaned_response_text:
-            print("Error: Could not find a valid JSON object in the model's response.")
-            print("Raw Gemini Response:", response.text)
-            return {}
+def _fallback_image_prompt(text_content: str) -> str:
+    return f"A beautiful social media image about: {text_content[:100]}"
+
+@functools.lru_cache(maxsize=256)
+def _request_image_prompt(snippet: str) -> str:
+    """
+    Asks Gemini to rewrite a text snippet as an image prompt.
+    Memoized on the snippet (only the first 300 characters are sent), so retries and
+    republished notes skip the round-trip; failures raise and are not cached.
+    """
+    cache = get_cache()
+    cache_key = make_key("gemini-image-prompt", "gemini-1.5-flash", snippet)
+    if cache:
+        cached = cache.get(cache_key)
+        if cached:
+            return cached
 
-        content = json.loads(cleaned_response_text.group(0))
+    client = _get_client(settings.gemini_api_key)
+    response = retry_transient(client.models.generate_content)(
+        model="gemini-1.5-flash",
+        contents=_IMAGE_PROMPT_TEMPLATE.format(text=snippet)
+    )
+    image_prompt = response.text.strip()
 
-        if all(k in content for k in ['title', 'content', 'tags']):
-            return content
-        else:
-            print("Error: Gemini response is missing required keys.")
-            print("Received JSON:", content)
-            return {}
-    except Exception as e:
-        print(f"Error calling Gemini API: {e}")
-        if 'response' in locals():
-            print("Raw Gemini Response:", response.text)
-        return {}
+    if cache:
+        cache.set(cache_key, image_prompt)
+    return image_prompt
 
 def _generate_image_prompt_with_gemini(text_content: str) -> str:
     """
     Uses Gemini to generate a highly descriptive, artistic English prompt for an image generation model.
     """
-    if not settings.GEMINI_API_KEY:
-        return f"A beautiful social media image about: {text_content[:100]}"
+    if not settings.gemini_api_key:
+        return _fallback_image_prompt(text_content)
     try:
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        full_prompt = f"You are an expert in visual art. Based on the text, create a concise, highly descriptive, and artistic prompt in English for an AI image model like Imagen. Focus on visual details, style, and lighting. The prompt should be a single, fluent sentence. Text: \"{text_content[:300]}\""
-        response = client.models.generate_content(
-            model="gemini-1.5-flash",
-            contents=full_prompt
-        )
-        return response.text.strip()
+        return _request_image_prompt(text_content[:300])
     except Exception:
-        return f"A beautiful social media image about: {text_content[:100]}"
+        return _fallback_image_prompt(text_content)
+
+async def _agenerate_image_prompt_with_gemini(text_content: str) -> str:
+    """
+    Async variant of _generate_image_prompt_with_gemini.
+    Runs the sync helper in a worker thread so it shares the in-process memo and the
+    persistent cache of _request_image_prompt instead of calling Gemini for every job.
+    """
+    return await asyncio.to_thread(_generate_image_prompt_with_gemini, text_content)
+
+def _save_generated_image(img_data, save_dir: str, i: int, total: int, timestamp: str) -> Optional[str]:
+    """
+    Saves one image returned by Imagen and returns its absolute path, or None on failure.
+    """
+    logger.info("Processing image %s/%s...", i+1, total)
+
+    try:
+        # Check the type of img_data.image
+        logger.info("Image data type: %s", type(img_data.image).__name__)
 
-def generate_images(text_content: str, save_dir: str, num_images: int = 1) -> list[str]:
+        path_stem = os.path.join(save_dir, f"generated_image_{timestamp}_{i+1}")
+
+        # Imagen usually returns encoded PNG/JPEG bytes (raw or as image.image_bytes);
+        # write those directly instead of decoding and re-encoding them with PIL
+        raw_bytes = img_data.image if isinstance(img_data.image, bytes) else getattr(img_data.image, 'image_bytes', None)
+        extension = sniff_image_extension(raw_bytes)
+
+        if extension:
+            filename = path_stem + extension
+            logger.info("Image is already encoded, writing bytes directly to: %s", filename)
+            with open(filename, 'wb') as f:
+                f.write(raw_bytes)
+        else:
+            filename = path_stem + ".png"
+            # The response.generated_images[i].image might be a PIL Image object directly
+            if isinstance(img_data.image, Image.Image):
+                logger.info("Image is already a PIL Image object")
+                img = img_data.image
+            elif isinstance(img_data.image, bytes):
+                logger.info("Image is raw bytes, converting to PIL Image")
+                img = Image.open(BytesIO(img_data.image))
+            else:
+                logger.warning("Unknown image type, attempting direct usage")
+                img = img_data.image
+
+            logger.info("Saving image to: %s", filename)
+            img.save(filename)
+
+        logger.info("Image %s saved successfully", i+1)
+        return os.path.abspath(filename)
+
+    except Exception as img_error:
+        logger.error("Failed to process image %s: %s", i+1, img_error)
+        logger.error("Exception type: %s", type(img_error).__name__)
+        if hasattr(img_data, '__dict__'):
+            logger.debug("img_data attributes: %s", img_data.__dict__.keys())
+        return None
+
+def _save_generated_images(generated_images, save_dir: str, timestamp: Optional[str] = None) -> list[str]:
+    """
+    Saves every image of an Imagen response and returns the paths that were written.
+    Callers saving several responses into one folder pass distinct timestamps.
+    generated_images is None when Imagen filtered out every image; nothing is saved then.
+    """
+    generated_images = generated_images or []
+    # Encoding and writing each image is independent, so save them in parallel.
+    # One timestamp per batch; the index keeps the filenames unique.
+    total = len(generated_images)
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    with ThreadPoolExecutor(max_workers=min(max(total, 1), 8)) as executor:
+        results = executor.map(
+            lambda item: _save_generated_image(item[1], save_dir, item[0], total, timestamp),
+            enumerate(generated_images)
+        )
+        return [path for path in results if path]
+
+def generate_images(text_content: str, save_dir: str, num_images: int = 1, image_prompt: Optional[str] = None) -> list[str]:
     """
     Generates images using Google's Imagen model and saves them to a local directory.
     This function now uses the correct BytesIO method as per the official documentation.
+    When image_prompt is given (e.g. from generate_text_content), the extra Gemini call
+    that rewrites text_content into an image prompt is skipped.
     """
-    print(f"\n[INFO] Starting image generation process...")
-    print(f"[INFO] Save directory: {save_dir}")
-    print(f"[INFO] Number of images requested: {num_images}")
+    logger.info("Starting image generation process...")
+    logger.info("Save directory: %s", save_dir)
+    logger.info("Number of images requested: %s", num_images)
 
-    if not settings.IMAGEN_API_KEY:
-        print("[ERROR] IMAGEN_API_KEY is not configured. Cannot generate images.")
+    if not settings.imagen_api_key:
+        logger.error("IMAGEN_API_KEY is not configured. Cannot generate images.")
         return []
 
     try:
-        print(f"[INFO] Initializing Imagen Client...")
-        client = genai.Client(api_key=settings.IMAGEN_API_KEY)
-        print(f"[INFO] Imagen Client initialized successfully")
+        logger.info("Initializing Imagen Client...")
+        client = _get_client(settings.imagen_api_key)
+        logger.info("Imagen Client initialized successfully")
     except Exception as e:
-        print(f"[ERROR] Failed to initialize Imagen Client: {e}")
-        print(f"[ERROR] Exception type: {type(e).__name__}")
+        logger.error("Failed to initialize Imagen Client: %s", e)
+        logger.error("Exception type: %s", type(e).__name__)
         return []
 
-    print("\n[INFO] Generating an optimized image prompt with Gemini...")
-    image_prompt = _generate_image_prompt_with_gemini(text_content)
-    print(f"[INFO] Optimized Image Prompt: {image_prompt}")
+    if image_prompt:
+        logger.info("Using provided image prompt: %s", image_prompt)
+    else:
+        logger.info("Generating an optimized image prompt with Gemini...")
+        image_prompt = _generate_image_prompt_with_gemini(text_content)
+        logger.info("Optimized Image Prompt: %s", image_prompt)
 
     try:
-        print(f"\n[INFO] Calling Imagen API...")
-        print(f"[INFO] Model: {settings.IMAGEN_MODEL_NAME}")
-        print(f"[INFO] Prompt length: {len(image_prompt)} characters")
+        logger.info("Calling Imagen API...")
+        logger.info("Model: %s", settings.imagen_model_name)
+        logger.info("Prompt length: %s characters", len(image_prompt))
 
-        response = client.models.generate_images(
-            model=settings.IMAGEN_MODEL_NAME,
+        response = retry_transient(client.models.generate_images)(
+            model=settings.imagen_model_name,
             prompt=image_prompt,
             config=types.GenerateImagesConfig(number_of_images=num_images)
         )
 
-        print(f"[INFO] API call successful, received response")
-        print(f"[INFO] Response type: {type(response).__name__}")
+        logger.info("API call successful, received response")
+        logger.info("Response type: %s", type(response).__name__)
 
-        if hasattr(response, 'generated_images'):
-            print(f"[INFO] Number of generated images: {len(response.generated_images)}")
-        else:
-            print(f"[ERROR] Response does not have 'generated_images' attribute")
-            print(f"[ERROR] Response attributes: {dir(response)}")
+        if not hasattr(response, 'generated_images'):
+            logger.error("Response does not have 'generated_images' attribute")
+            logger.error("Response attributes: %s", dir(response))
             return []
+        if not response.generated_images:
+            logger.error("Imagen returned no images (all of them may have been filtered)")
+            return []
+        logger.info("Number of generated images: %s", len(response.generated_images))
 
-        saved_image_paths = []
-        for i, img_data in enumerate(response.generated_images):
-            print(f"\n[INFO] Processing image {i+1}/{len(response.generated_images)}...")
+        saved_image_paths = _save_generated_images(response.generated_images, save_dir)
 
-            try:
-                # Check the type of img_data.image
-                print(f"[INFO] Image data type: {type(img_data.image).__name__}")
-
-                # The response.generated_images[i].image might be a PIL Image object directly
-                if isinstance(img_data.image, Image.Image):
-                    print(f"[INFO] Image is already a PIL Image object")
-                    img = img_data.image
-                elif isinstance(img_data.image, bytes):
-                    print(f"[INFO] Image is raw bytes, converting to PIL Image")
-                    img = Image.open(BytesIO(img_data.image))
-                else:
-                    print(f"[WARNING] Unknown image type, attempting direct usage")
-                    img = img_data.image
-
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = os.path.join(save_dir, f"generated_image_{timestamp}_{i+1}.png")
-
-                print(f"[INFO] Saving image to: {filename}")
-                img.save(filename)
-
-                saved_image_paths.append(os.path.abspath(filename))
-                print(f"[SUCCESS] Image {i+1} saved successfully")
-
-            except Exception as img_error:
-                print(f"[ERROR] Failed to process image {i+1}: {img_error}")
-                print(f"[ERROR] Exception type: {type(img_error).__name__}")
-                if hasattr(img_data, '__dict__'):
-                    print(f"[DEBUG] img_data attributes: {img_data.__dict__.keys()}")
-                continue
-
-        print(f"\n[SUCCESS] Total images saved: {len(saved_image_paths)}")
+        logger.info("Total images saved: %s", len(saved_image_paths))
         return saved_image_paths
 
     except Exception as e:
-        print(f"\n[ERROR] Image generation failed: {e}")
-        print(f"[ERROR] Exception type: {type(e).__name__}")
+        logger.error("Image generation failed: %s", e)
+        logger.error("Exception type: %s", type(e).__name__)
 
         # Try to extract more error information
         if hasattr(e, '__dict__'):
-            print(f"[DEBUG] Error attributes: {e.__dict__}")
+            logger.debug("Error attributes: %s", e.__dict__)
         if hasattr(e, 'message'):
-            print(f"[ERROR] Error message: {e.message}")
+            logger.error("Error message: %s", e.message)
         if hasattr(e, 'code'):
-            print(f"[ERROR] Error code: {e.code}")
+            logger.error("Error code: %s", e.code)
         if hasattr(e, 'details'):
-            print(f"[ERROR] Error details: {e.details}")
+            logger.error("Error details: %s", e.details)
 
         return []
 
+async def generate_images_pipeline(jobs: list[tuple[str, str]], num_images: int = 1) -> list[list[str]]:
+    """
+    Generates images for several notes as a staged pipeline.
+
+    Stage 1 asks Gemini for the optimized image prompt, stage 2 calls Imagen and
+    stage 3 writes the files. The stages are connected by bounded queues, so the
+    prompt for note N+1 is already being written while Imagen renders note N.
+
+    Args:
+        jobs: (text_content, save_dir) pairs, one per note
+        num_images: Number of images to generate per note
+
+    Returns:
+        Saved image paths for each job, in the same order as jobs
+    """
+    results: list[list[str]] = [[] for _ in jobs]
+    if not jobs:
+        return results
+
+    if not settings.imagen_api_key:
+        logger.error("IMAGEN_API_KEY is not configured. Cannot generate images.")
+        return results
+
+    client = _get_client(settings.imagen_api_key)
+    prompts: asyncio.Queue = asyncio.Queue(maxsize=2)
+    responses: asyncio.Queue = asyncio.Queue(maxsize=2)
+
+    async def optimize_prompts():
+        for index, (text_content, _) in enumerate(jobs):
+            image_prompt = await _agenerate_image_prompt_with_gemini(text_content)
+            logger.info("Optimized Image Prompt (%s/%s): %s", index + 1, len(jobs), image_prompt)
+            await prompts.put((index, image_prompt))
+        await prompts.put(None)
+
+    async def render_images():
+        while (item := await prompts.get()) is not None:
+            index, image_prompt = item
+            try:
+                response = await retry_transient(client.aio.models.generate_images)(
+                    model=settings.imagen_model_name,
+                    prompt=image_prompt,
+                    config=types.GenerateImagesConfig(number_of_images=num_images)
+                )
+                await responses.put((index, response.generated_images))
+            except Exception as e:
+                logger.error("Image generation failed for job %s: %s", index + 1, e)
+        await responses.put(None)
+
+    async def save_images():
+        while (item := await responses.get()) is not None:
+            index, generated_images = item
+            save_dir = jobs[index][1]
+            try:
+                results[index] = await asyncio.to_thread(_save_generated_images, generated_images, save_dir)
+            except Exception as e:
+                # Keep draining the queue so the other stages are never left blocked
+                logger.error("Saving images failed for job %s: %s", index + 1, e)
+
+    await asyncio.gather(optimize_prompts(), render_images(), save_images())
+    return results
+
+def generate_post(prompt: str, save_dir: str, num_images: int = 1) -> dict:
+    """
+    Generates a complete note: one Gemini call returns the title, content, tags and
+    image prompt, which then goes straight to Imagen.
+
+    Returns:
+        The note content with an added "image_paths" list, or {} if text generation failed
+    """
+    content = generate_text_content(prompt)
+    if not content:
+        return {}
+
+    content['image_paths'] = generate_images(
+        content['content'], save_dir, num_images, image_prompt=content.get('image_prompt')
+    )
+    return content
+
+async def agenerate_images_batch(texts: list[str], save_dir: str, num_per_text: int = 1) -> list[list[str]]:
+    """
+    Generates images for several texts with as few API calls as possible.
+
+    Identical texts are grouped, so each unique text gets one prompt optimization
+    and one Imagen request for all of its images (split into requests of at most
+    _MAX_IMAGES_PER_REQUEST). Prompt optimizations and Imagen requests for
+    different texts run concurrently. Prefer this over calling generate_images
+    once per image.
+
+    Args:
+        texts: Text content per image set; duplicates are generated together
+        save_dir: Directory to save generated images
+        num_per_text: Number of images per entry in texts
+
+    Returns:
+        Saved image paths for each entry in texts, in the same order
+    """
+    results: list[list[str]] = [[] for _ in texts]
+    if not texts:
+        return results
+
+    if not settings.imagen_api_key:
+        logger.error("IMAGEN_API_KEY is not configured. Cannot generate images.")
+        return results
+
+    # Unique text -> positions in texts
+    groups: dict[str, list[int]] = {}
+    for index, text_content in enumerate(texts):
+        groups.setdefault(text_content, []).append(index)
+
+    # The sync helper is memoized, so run it in threads to share that cache
+    unique_texts = list(groups)
+    image_prompts = await asyncio.gather(
+        *(asyncio.to_thread(_generate_image_prompt_with_gemini, text_content) for text_content in unique_texts)
+    )
+
+    client = _get_client(settings.imagen_api_key)
+    batch_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    async def render(group: int, text_content: str, image_prompt: str):
+        positions = groups[text_content]
+        count = num_per_text * len(positions)
+        paths: list[str] = []
+        for offset in range(0, count, _MAX_IMAGES_PER_REQUEST):
+            try:
+                response = await retry_transient(client.aio.models.generate_images)(
+                    model=settings.imagen_model_name,
+                    prompt=image_prompt,
+                    config=types.GenerateImagesConfig(number_of_images=min(_MAX_IMAGES_PER_REQUEST, count - offset))
+                )
+                paths += await asyncio.to_thread(
+                    _save_generated_images, response.generated_images, save_dir,
+                    f"{batch_timestamp}_{group + 1}_{offset // _MAX_IMAGES_PER_REQUEST + 1}"
+                )
+            except Exception as e:
+                # Only this text loses its remaining images; the other renders carry on
+                logger.error("Image generation failed for text %s: %s", group + 1, e)
+                break
+
+        # Hand each occurrence of the text its share of the images
+        for slot, position in enumerate(positions):
+            results[position] = paths[slot * num_per_text:(slot + 1) * num_per_text]
+
+    await asyncio.gather(*(
+        render(group, text_content, image_prompt)
+        for group, (text_content, image_prompt) in enumerate(zip(unique_texts, image_prompts))
+    ))
+    return results
+
+def generate_images_batch(texts: list[str], save_dir: str, num_per_text: int = 1) -> list[list[str]]:
+    """
+    Synchronous wrapper around agenerate_images_batch for callers without an event loop.
+    """
+    return asyncio.run(agenerate_images_batch(texts, save_dir, num_per_text))
+
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
     test_prompt = "A robot artist painting a futuristic cityscape"
     temp_dir = os.path.join("data", "temp_test")
     os.makedirs(temp_dir, exist_ok=True)
@@ -4,58 +4,244 @@ Provides 2000 free API calls per day for text and image generation.
 """
 
 import os
-import json
-import re
-import requests
+import asyncio
+import binascii
+import logging
+import shutil
+import random
 import time
-from typing import Dict, List, Optional
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from io import BytesIO
 from PIL import Image
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from config import settings
-from services.ai_service import AIService
+from services import fast_json
+from services.ai_service import AIService, register
+from services.llm_cache import get_cache, make_request_key
+from services.network import download_image, make_session, retry_submit, retry_transient, sniff_image_extension
+
+logger = logging.getLogger(__name__)
+
+# Shared across instances for image downloads from the CDN, so keep-alive
+# connections are reused between downloads and generate_images calls.
+_session = make_session(pool_connections=10, pool_maxsize=20)
+# URL pre-checks are only a hint, so they are sent once and never retried
+_head_session = make_session(pool_connections=10, pool_maxsize=20, retries=0)
+
+# Task status polling: start fast, back off to _POLL_MAX_DELAY, give up after _POLL_TIMEOUT seconds
+_POLL_INITIAL_DELAY = 0.5
+_POLL_MAX_DELAY = 5.0
+_POLL_BACKOFF = 1.6
+_POLL_JITTER = 0.2
+_POLL_TIMEOUT = 180.0
+
+# Concurrent image downloads, kept below the session's connection pool size
+_MAX_DOWNLOAD_WORKERS = 8
+
+# Image URL pre-check before a multi-image download: URLs answering with these
+# statuses are dropped; anything else (signed URLs may refuse HEAD, a HEAD may time
+# out) is still fetched
+_HEAD_TIMEOUT = 5
+_GONE_STATUSES = (404, 410)
+
+# System prompt for Xiaohongshu content
+_XHS_SYSTEM_PROMPT = """你是一个专业的小红书内容创作助手。
+你需要根据用户提供的主题，生成符合小红书风格的内容。
+输出必须是一个有效的JSON对象，包含以下四个键：
+1. "title": 标题（最多20个字，吸引眼球）
+2. "content": 正文内容（300-500字，包含emoji，分段清晰，实用性强）
+3. "tags": 标签列表（3-5个相关标签）
+4. "image_prompt": 图片生成提示词（50-150字，描述场景、风格、色调、构图等视觉元素）
+
+示例输出：
+{
+  "title": "周末宅家也能瘦！懒人减脂秘籍✨",
+  "content": "姐妹们！谁说减肥一定要去健身房？今天分享我的懒人减脂法～\n\n🌟 早餐这样吃\n...",
+  "tags": ["减脂", "懒人瘦身", "宅家运动", "健康生活"],
+  "image_prompt": "明亮温馨的家居场景，展示健康早餐和运动瑜伽垫，暖色调，自然光线，ins风格摄影"
+}"""
+
+_USER_PROMPT_TEMPLATE = "请为以下主题创作小红书内容：{prompt}"
+
+_API_BASE_URL = 'https://api-inference.modelscope.cn/v1/'
 
+# How long the result of the models.list() connectivity probe is reused (seconds)
+_AVAILABILITY_TTL = 300.0
+# Timeout of that probe; it is sent once, without the client's retries
+_CONNECTIVITY_TIMEOUT = 5.0
 
+
+def _decode_base64_image(data) -> bytes:
+    """Decode base64 image data, accepting an optional data:image/...;base64, URI prefix."""
+    if isinstance(data, str):
+        data = data.encode('ascii')
+    if data[:5] == b'data:':
+        data = data[data.index(b',') + 1:]
+    return binascii.a2b_base64(data)
+
+
+class _JSONObjectScanner:
+    """
+    Picks complete top-level JSON objects out of streamed text.
+
+    Brace depth is tracked (ignoring braces inside strings) over each new chunk
+    only, so the whole scan is linear in the response length and every object
+    is handed back for decoding exactly once, when its closing brace arrives.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._object: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return ''.join(self._parts)
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk and return the text of each top-level object it completes."""
+        self._parts.append(chunk)
+        completed = []
+        start = 0
+        for i, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                # Quotes outside an object are just text
+                self._in_string = self._depth > 0
+            elif char == '{':
+                if not self._depth:
+                    start = i
+                self._depth += 1
+            elif char == '}' and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    self._object.append(chunk[start:i + 1])
+                    completed.append(''.join(self._object))
+                    self._object = []
+
+        if self._depth:
+            self._object.append(chunk[start:])
+        return completed
+
+
+@register("modelscope")
 class ModelScopeAIService(AIService):
     """ModelScope API-Inference service implementation."""
 
     def __init__(self):
         """Initialize ModelScope service with API credentials."""
-        self.api_key = settings.MODELSCOPE_API_KEY
-        self.text_model = settings.MS_TEXT_MODEL
-        self.image_model = settings.MS_IMAGE_MODEL
-        self.enable_thinking = settings.MS_ENABLE_THINKING
+        self.api_key = settings.modelscope_api_key
+        self.text_model = settings.ms_text_model
+        self.image_model = settings.ms_image_model
+        self.enable_thinking = settings.ms_enable_thinking
+
+        # Session for the API itself: the Authorization header is sent by default on
+        # every submit and poll. Image downloads go to the CDN through the shared
+        # module session instead, so the key never leaves api-inference.modelscope.cn.
+        self._api_session = make_session(pool_connections=1, pool_maxsize=4)
+        if self.api_key:
+            self._api_session.headers["Authorization"] = f"Bearer {self.api_key}"
+
+        # Per-request headers are fixed, so build them once
+        self._submit_headers = {
+            "Content-Type": "application/json",
+            "X-ModelScope-Async-Mode": "true"  # Enable async mode
+        }
+        self._poll_headers = {
+            "X-ModelScope-Task-Type": "image_generation"
+        }
+
+        # (checked_at, available) of the last connectivity probe
+        self._availability_cache: Optional[Tuple[float, bool]] = None
 
-        # Initialize OpenAI-compatible client for text generation
+        # OpenAI-compatible clients for text generation, created on first use
+        self._client: Optional[OpenAI] = None
+        self._async_client: Optional[AsyncOpenAI] = None
         if self.api_key:
-            self.client = OpenAI(
-                base_url='https://api-inference.modelscope.cn/v1/',
+            logger.debug("ModelScope API Key configured: %s...", self.api_key[:10])
+        else:
+            logger.warning("ModelScope API Key not found")
+
+    @property
+    def client(self) -> Optional[OpenAI]:
+        """
+        OpenAI-compatible client for text generation.
+
+        Built lazily so image-only use (plain HTTP requests) never pays for it;
+        None when no API key is configured.
+        """
+        if self._client is None and self.api_key:
+            self._client = OpenAI(
+                base_url=_API_BASE_URL,
                 api_key=self.api_key,
+                # Retries are handled by retry_transient around each call
+                max_retries=0,
             )
-            print(f"[DEBUG] ModelScope API Key configured: {self.api_key[:10]}...")
-        else:
-            self.client = None
-            print("[WARNING] ModelScope API Key not found")
+        return self._client
+
+    @property
+    def async_client(self) -> Optional[AsyncOpenAI]:
+        """Async counterpart of client, used by agenerate_text_content."""
+        if self._async_client is None and self.api_key:
+            self._async_client = AsyncOpenAI(
+                base_url=_API_BASE_URL,
+                api_key=self.api_key,
+                # Retries are handled by retry_transient around each call
+                max_retries=0,
+            )
+        return self._async_client
 
     def is_available(self) -> bool:
-        """Check if ModelScope service is properly configured."""
+        """
+        Check if ModelScope service is properly configured.
+
+        Only the configuration is checked, so this is free to call before every
+        request; connection problems surface on first use or via verify_connectivity().
+        Set PROBE_NETWORK=true to make this check connectivity as well.
+        """
+        if not self.api_key:
+            logger.warning("MODELSCOPE_API_KEY is not configured")
+            return False
+        if settings.probe_network:
+            return self.verify_connectivity()
+        return True
+
+    def verify_connectivity(self) -> bool:
+        """
+        Check that the ModelScope API can actually be reached, e.g. once at startup.
+
+        Makes a models.list() call; the result is reused for _AVAILABILITY_TTL seconds.
+        """
         if not self.api_key:
-            print("[WARNING] MODELSCOPE_API_KEY is not configured")
             return False
 
-        # Try a simple API call to verify connectivity
+        now = time.monotonic()
+        if self._availability_cache and now - self._availability_cache[0] < _AVAILABILITY_TTL:
+            return self._availability_cache[1]
+
+        available = True
         try:
-            if self.client:
-                # Test with a minimal request
-                response = self.client.models.list()
-                return True
+            # Test with a minimal request
+            self.client.with_options(timeout=_CONNECTIVITY_TIMEOUT, max_retries=0).models.list()
         except Exception as e:
-            print(f"[WARNING] ModelScope API test failed: {e}")
-            return False
+            logger.warning("ModelScope API test failed: %s", e)
+            available = False
 
-        return True
+        self._availability_cache = (now, available)
+        return available
 
     def generate_text_content(self, prompt: str) -> Dict:
         """
@@ -68,67 +254,132 @@ class ModelScopeAIService(AIService):
             Dict with title, content, and tags
         """
         if not self.client:
-            print("[ERROR] ModelScope client not initialized")
+            logger.error("ModelScope client not initialized")
             return {}
 
         try:
-            print(f"[INFO] Using ModelScope model: {self.text_model}")
-            print(f"[INFO] Thinking mode enabled: {self.enable_thinking}")
+            request, cache_key = self._build_text_request(prompt)
+
+            # The raw model text is cached; parsing it again on a hit is cheap
+            cache = get_cache()
+            cached = cache.get(cache_key) if cache else None
+            if cached:
+                logger.info("Using cached ModelScope response for this topic")
+                return self._parse_json_response(cached)
+
+            stream = retry_transient(self.client.chat.completions.create)(**request)
+            scanner = _JSONObjectScanner()
+            content = None
+            # Closing the stream on an early return drops the rest of the response
+            with stream:
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta and (content := self._parse_completed_objects(scanner.feed(delta))):
+                        break
+
+            text = scanner.text
+            if cache and text:
+                cache.set(cache_key, text)
+            return self._finish_text_response(text, content)
 
-            # System prompt for Xiaohongshu content
-            system_prompt = """你是一个专业的小红书内容创作助手。
-你需要根据用户提供的主题，生成符合小红书风格的内容。
-输出必须是一个有效的JSON对象，包含以下四个键：
-1. "title": 标题（最多20个字，吸引眼球）
-2. "content": 正文内容（300-500字，包含emoji，分段清晰，实用性强）
-3. "tags": 标签列表（3-5个相关标签）
-4. "image_prompt": 图片生成提示词（50-150字，描述场景、风格、色调、构图等视觉元素）
-
-示例输出：
-{
-  "title": "周末宅家也能瘦！懒人减脂秘籍✨",
-  "content": "姐妹们！谁说减肥一定要去健身房？今天分享我的懒人减脂法～\n\n🌟 早餐这样吃\n...",
-  "tags": ["减脂", "懒人瘦身", "宅家运动", "健康生活"],
-  "image_prompt": "明亮温馨的家居场景，展示健康早餐和运动瑜伽垫，暖色调，自然光线，ins风格摄影"
-}"""
-
-            # Call API with thinking mode support
-            messages = [
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': f"请为以下主题创作小红书内容：{prompt}"}
-            ]
-
-            # Add thinking configuration if enabled
-            extra_body = {}
-            if self.enable_thinking and 'thinking' in self.text_model.lower():
-                extra_body = {
-                    'enable_thinking': True,
-                    'thinking_budget': 8192
-                }
-
-            response = self.client.chat.completions.create(
-                model=self.text_model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=2000,
-                stream=False,
-                **({'extra_body': extra_body} if extra_body else {})
-            )
+        except Exception as e:
+            logger.error("ModelScope text generation failed: %s", e)
+            return {}
 
-            # Extract and parse response
-            content = response.choices[0].message.content
-            # Use repr() to safely print content that may contain unicode characters
-            try:
-                print(f"[DEBUG] Raw response: {content[:200]}...")
-            except:
-                print(f"[DEBUG] Raw response: {repr(content[:200])}...")
+    async def agenerate_text_content(self, prompt: str) -> Dict:
+        """
+        Async variant of generate_text_content using the AsyncOpenAI client, so
+        concurrent notes do not each hold a worker thread while the model runs.
+        """
+        if not self.async_client:
+            logger.error("ModelScope client not initialized")
+            return {}
 
-            return self._parse_json_response(content)
+        try:
+            request, cache_key = self._build_text_request(prompt)
+
+            cache = get_cache()
+            cached = await asyncio.to_thread(cache.get, cache_key) if cache else None
+            if cached:
+                logger.info("Using cached ModelScope response for this topic")
+                return self._parse_json_response(cached)
+
+            stream = await retry_transient(self.async_client.chat.completions.create)(**request)
+            scanner = _JSONObjectScanner()
+            content = None
+            async with stream:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta and (content := self._parse_completed_objects(scanner.feed(delta))):
+                        break
+
+            text = scanner.text
+            if cache and text:
+                await asyncio.to_thread(cache.set, cache_key, text)
+            return self._finish_text_response(text, content)
 
         except Exception as e:
-            print(f"[ERROR] ModelScope text generation failed: {e}")
+            logger.error("ModelScope text generation failed: %s", e)
             return {}
 
+    def _build_text_request(self, prompt: str) -> Tuple[Dict, str]:
+        """
+        Build the chat completion arguments for a topic.
+
+        Returns:
+            (keyword arguments for chat.completions.create, response cache key)
+        """
+        logger.info("Using ModelScope model: %s", self.text_model)
+        logger.info("Thinking mode enabled: %s", self.enable_thinking)
+
+        # Call API with thinking mode support
+        messages = [
+            {'role': 'system', 'content': _XHS_SYSTEM_PROMPT},
+            {'role': 'user', 'content': _USER_PROMPT_TEMPLATE.format(prompt=prompt)}
+        ]
+        request = {
+            'model': self.text_model,
+            'messages': messages,
+            'temperature': 0.7,
+            'max_tokens': 2000,
+            # Streamed so generation can stop as soon as the JSON object is complete
+            'stream': True,
+        }
+
+        # Add thinking configuration if enabled
+        if self.enable_thinking and 'thinking' in self.text_model.lower():
+            request['extra_body'] = {
+                'enable_thinking': True,
+                'thinking_budget': 8192
+            }
+
+        return request, make_request_key(self.text_model, messages, 0.7)
+
+    def _parse_completed_objects(self, objects: List[str]) -> Optional[Dict]:
+        """
+        Return the note once a streamed JSON object with the required fields is
+        complete, or None to keep reading.
+        """
+        for text in objects:
+            try:
+                content = self._validate_content(fast_json.loads(text))
+            except fast_json.JSONDecodeError:
+                continue
+            if content:
+                return content
+        return None
+
+    def _finish_text_response(self, text: str, content: Optional[Dict]) -> Dict:
+        """
+        Return the note content for a finished (or early-stopped) stream.
+
+        Args:
+            text: Model text received (up to the early stop, if any)
+            content: Note parsed while streaming, or None to parse text now
+        """
+        logger.debug("Raw response: %.200s...", text)
+        return content if content else self._parse_json_response(text)
+
     def generate_images(self, text_content: str, save_dir: str, num_images: int = 1, image_prompt: Optional[str] = None) -> List[str]:
         """
         Generate images using ModelScope API-Inference with async mode.
@@ -143,173 +394,159 @@ class ModelScopeAIService(AIService):
             List of saved image paths
         """
         if not self.api_key:
-            print("[ERROR] ModelScope API key not configured")
+            logger.error("ModelScope API key not configured")
             return []
 
         try:
-            print(f"[INFO] Generating images with model: {self.image_model}")
+            logger.info("Generating images with model: %s", self.image_model)
 
             # Use provided image_prompt if available, otherwise generate one
             if image_prompt:
                 final_prompt = image_prompt
-                print(f"[INFO] Using provided image prompt: {final_prompt[:100]}...")
+                logger.info("Using provided image prompt: %s...", final_prompt[:100])
             else:
                 final_prompt = self._generate_image_prompt(text_content)
-                print(f"[INFO] Generated image prompt: {final_prompt[:100]}...")
+                logger.info("Generated image prompt: %s...", final_prompt[:100])
 
             model_to_use = self.image_model
             if "qwen-image" in model_to_use.lower():
-                print("[INFO] Correcting model name to 'Qwen/Qwen-Image' for API call")
+                logger.info("Correcting model name to 'Qwen/Qwen-Image' for API call")
                 model_to_use = "Qwen/Qwen-Image"
 
-            base_url = 'https://api-inference.modelscope.cn/'
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "X-ModelScope-Async-Mode": "true"  # Enable async mode
-            }
+            # Reuse the images of an identical earlier request (development runs)
+            cache = get_cache()
+            cache_key = make_request_key(model_to_use, [final_prompt, num_images])
+            cached = cache.get(cache_key) if cache else None
+            if cached:
+                paths = self._copy_cached_images(cached, save_dir)
+                if paths:
+                    logger.info("Using cached ModelScope images for this prompt")
+                    return paths
 
+            base_url = 'https://api-inference.modelscope.cn/'
             # Step 1: Submit image generation task
-            print(f"[INFO] Submitting image generation task with model: {model_to_use}")
+            logger.info("Submitting image generation task with model: %s", model_to_use)
 
             payload = {
                 "model": model_to_use,
                 "prompt": final_prompt
             }
 
-            response = requests.post(
-                f"{base_url}v1/images/generations",
-                headers=headers,
-                data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
-                timeout=30
-            )
+            try:
+                response = self._submit_image_task(f"{base_url}v1/images/generations", payload)
+            except requests.HTTPError as e:
+                # Still rate limited or failing after the retries
+                response = e.response
 
             if response.status_code != 200:
-                print(f"[ERROR] Failed to submit task: {response.status_code}")
-                print(f"[ERROR] Response: {response.text[:500]}")
+                logger.error("Failed to submit task: %s", response.status_code)
+                logger.error("Response: %s", response.text[:500])
                 return []
 
-            task_id = response.json().get("task_id")
+            task_id = fast_json.loads(response.content).get("task_id")
             if not task_id:
-                print("[ERROR] No task_id returned from API")
+                logger.error("No task_id returned from API")
                 return []
 
-            print(f"[INFO] Task submitted successfully, task_id: {task_id}")
+            logger.info("Task submitted successfully, task_id: %s", task_id)
 
-            # Step 2: Poll for task completion
-            max_attempts = 60  # Wait up to 2 minutes
-            poll_interval = 2  # Check every 2 seconds
+            # Step 2: Poll for task completion, quickly at first and then backing off
+            # (with jitter) for long-running tasks, until the wall-clock deadline.
+            # Each sleep is shortened by the previous status round-trip, so the
+            # answer arrives when the interval ends instead of one round-trip later.
+            status_url = f"{base_url}v1/tasks/{task_id}"
+            deadline = time.monotonic() + _POLL_TIMEOUT
+            delay = _POLL_INITIAL_DELAY
+            attempt = 0
+            round_trip = 0.0
 
-            for attempt in range(max_attempts):
-                time.sleep(poll_interval)
+            while time.monotonic() < deadline:
+                wait = delay + random.uniform(0, _POLL_JITTER) - round_trip
+                time.sleep(max(min(wait, deadline - time.monotonic()), 0))
+                delay = min(delay * _POLL_BACKOFF, _POLL_MAX_DELAY)
+                attempt += 1
 
-                result_response = requests.get(
-                    f"{base_url}v1/tasks/{task_id}",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "X-ModelScope-Task-Type": "image_generation"
-                    },
-                    timeout=10
-                )
+                started = time.monotonic()
+                result_response = self._get_task_status(status_url)
+                round_trip = time.monotonic() - started
 
                 if result_response.status_code != 200:
-                    print(f"[WARNING] Failed to check task status: {result_response.status_code}")
+                    logger.warning("Failed to check task status: %s", result_response.status_code)
                     continue
 
-                data = result_response.json()
+                data = fast_json.loads(result_response.content)
                 task_status = data.get("task_status")
 
-                print(f"[INFO] Task status: {task_status} (attempt {attempt + 1}/{max_attempts})")
+                logger.info("Task status: %s (attempt %s)", task_status, attempt)
 
                 if task_status == "SUCCEED":
-                    # Download and save images
-                    output_images = data.get("output_images", [])
+                    # Keep only the images we need, and release the raw body and
+                    # the rest of the decoded response before downloading
+                    output_images = data.get("output_images", [])[:num_images]
+                    del data, result_response
                     if not output_images:
-                        print("[ERROR] No images in response")
+                        logger.error("No images in response")
                         return []
 
-                    saved_paths = []
-                    for i, img_url in enumerate(output_images[:num_images]):
-                        print(f"[INFO] Downloading image {i+1} from: {img_url[:50]}...")
-
-                        try:
-                            img_response = requests.get(img_url, timeout=30)
-                            if img_response.status_code == 200:
-                                img = Image.open(BytesIO(img_response.content))
-
-                                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                                filename = os.path.join(save_dir, f"modelscope_image_{timestamp}_{i+1}.png")
-                                img.save(filename)
-
-                                saved_paths.append(os.path.abspath(filename))
-                                print(f"[SUCCESS] Image saved to: {filename}")
-                            else:
-                                print(f"[ERROR] Failed to download image: {img_response.status_code}")
-                        except Exception as e:
-                            print(f"[ERROR] Error downloading image {i+1}: {e}")
-
-                    if saved_paths:
-                        return saved_paths
-                    else:
-                        return []
+                    paths = self._download_images(output_images, save_dir)
+                    if cache and paths:
+                        cache.set(cache_key, paths)
+                    return paths
 
                 elif task_status == "FAILED":
                     error_msg = data.get("error", "Unknown error")
-                    print(f"[ERROR] Task failed: {error_msg}")
+                    logger.error("Task failed: %s", error_msg)
                     return []
 
                 elif task_status not in ["PENDING", "RUNNING", "PROCESSING"]:
-                    print(f"[WARNING] Unknown task status: {task_status}")
+                    logger.warning("Unknown task status: %s", task_status)
 
-            print("[ERROR] Timeout waiting for image generation")
-            return self._fallback_to_placeholder(image_prompt, save_dir, num_images)
+            logger.error("Timeout waiting for image generation")
+            return []
 
         except Exception as e:
-            print(f"[ERROR] ModelScope image generation error: {e}")
-            return self._fallback_to_placeholder(image_prompt, save_dir, num_images)
-
-
-    def _save_base64_image(self, b64_data: str, save_dir: str, index: int) -> Optional[str]:
-        """Save base64 encoded image."""
-        try:
-            import base64
-
-            img_bytes = base64.b64decode(b64_data)
-            img = Image.open(BytesIO(img_bytes))
+            logger.error("ModelScope image generation error: %s", e)
+            return []
 
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(save_dir, f"modelscope_image_{timestamp}_{index+1}.png")
-            img.save(filename)
+    def _get_task_status(self, status_url: str) -> requests.Response:
+        """Fetch the status of an image generation task."""
+        return self._api_session.get(status_url, headers=self._poll_headers, timeout=10)
 
-            print(f"[SUCCESS] Image saved to: {filename}")
-            return os.path.abspath(filename)
+    @retry_submit
+    def _submit_image_task(self, url: str, payload: Dict) -> requests.Response:
+        """
+        Submit an async image generation task.
 
-        except Exception as e:
-            print(f"[ERROR] Failed to save base64 image: {e}")
-            return None
+        Submitting is not idempotent, so it is only resent when the connection could
+        not be made or the API answered 429 (raised here so retry_submit can back
+        off); any other response is returned to the caller.
+        """
+        response = self._api_session.post(
+            url,
+            headers=self._submit_headers,
+            data=fast_json.dumps(payload),
+            timeout=30
+        )
+        if response.status_code == 429:
+            response.raise_for_status()
+        return response
 
     def _parse_json_response(self, response_text: str) -> Dict:
         """Parse JSON from model response."""
         try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                content = json.loads(json_match.group(0))
-
-                # Validate required fields
-                if all(k in content for k in ['title', 'content', 'tags']):
-                    # Ensure title is within limit
-                    content['title'] = content['title'][:20]
-                    return content
-                else:
-                    print("[WARNING] Response missing required fields")
-                    return self._create_fallback_content(response_text)
-            else:
-                print("[WARNING] No JSON found in response")
+            content = self._extract_json(response_text)
+            if content is None:
+                logger.warning("No JSON found in response")
+                return self._create_fallback_content(response_text)
+
+            validated = self._validate_content(content)
+            if validated is None:
+                logger.warning("Response missing required fields")
                 return self._create_fallback_content(response_text)
+            return validated
 
-        except json.JSONDecodeError as e:
-            print(f"[ERROR] Failed to parse JSON: {e}")
+        except fast_json.JSONDecodeError as e:
+            logger.error("Failed to parse JSON: %s", e)
             return self._create_fallback_content(response_text)
 
     def _create_fallback_content(self, text: str) -> Dict:
@@ -340,50 +577,123 @@ class ModelScopeAIService(AIService):
 
         return prompt
 
-    def _save_image(self, img_data, save_dir: str, index: int) -> Optional[str]:
-        """Save image data to file."""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(save_dir, f"modelscope_image_{timestamp}_{index+1}.png")
-
-            # Handle different image data formats
-            if isinstance(img_data, str):
-                # Base64 encoded image
-                import base64
-                img_bytes = base64.b64decode(img_data)
-                img = Image.open(BytesIO(img_bytes))
-            elif isinstance(img_data, bytes):
-                # Raw bytes
-                img = Image.open(BytesIO(img_data))
-            else:
-                # Already a PIL Image
-                img = img_data
+    def _copy_cached_images(self, cached_paths: List[str], save_dir: str) -> List[str]:
+        """
+        Copy previously generated images into save_dir.
+
+        Returns:
+            The new paths, or [] if any cached file no longer exists
+        """
+        if not all(os.path.isfile(path) for path in cached_paths):
+            return []
 
-            img.save(filename)
-            print(f"[SUCCESS] Image saved to: {filename}")
-            return os.path.abspath(filename)
+        os.makedirs(save_dir, exist_ok=True)
+        paths = []
+        for path in cached_paths:
+            target = os.path.join(save_dir, os.path.basename(path))
+            if os.path.abspath(target) != os.path.abspath(path):
+                shutil.copy2(path, target)
+            paths.append(os.path.abspath(target))
+        return paths
+
+    def _download_images(self, urls: List[str], save_dir: str) -> List[str]:
+        """Download all image URLs concurrently and return the paths that were saved."""
+        if not urls:
+            return []
 
-        except Exception as e:
-            print(f"[ERROR] Failed to save image {index+1}: {e}")
-            return None
+        # Resolved and created once per batch, not per image; one timestamp per
+        # batch too, the index keeps the filenames unique
+        save_dir = os.path.abspath(save_dir)
+        os.makedirs(save_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        # A single image (the common case) needs no thread pool
+        if len(urls) == 1:
+            path = self._persist_image(urls[0], save_dir, 0, timestamp)
+            return [path] if path else []
+
+        # Downloads are network-bound; every one runs concurrently over the shared session
+        with ThreadPoolExecutor(max_workers=min(len(urls), _MAX_DOWNLOAD_WORKERS)) as executor:
+            items = self._rank_download_items(list(enumerate(urls)), executor)
+            paths = executor.map(
+                lambda item: (item[0], self._persist_image(item[1], save_dir, item[0], timestamp)),
+                items
+            )
+            # Downloaded in size order, returned in output_images order (the first is the cover)
+            return [path for _, path in sorted(paths) if path]
 
-    def _download_and_save_image(self, img_url: str, save_dir: str, index: int) -> Optional[str]:
-        """Download and save image from URL."""
-        try:
-            response = requests.get(img_url, timeout=30)
-            if response.status_code == 200:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = os.path.join(save_dir, f"modelscope_image_{timestamp}_{index+1}.png")
+    def _rank_download_items(self, items: List[Tuple[int, str]], executor: ThreadPoolExecutor) -> List[Tuple[int, str]]:
+        """
+        Check image URLs with concurrent HEAD requests before downloading them.
 
-                img = Image.open(BytesIO(response.content))
-                img.save(filename)
+        Links that are gone (404/410) are dropped up front instead of each costing
+        a failed GET, and the rest are ordered smallest first so the first images
+        land sooner. Inline (base64) images need no request and come first.
 
-                print(f"[SUCCESS] Image downloaded and saved to: {filename}")
-                return os.path.abspath(filename)
-            else:
-                print(f"[ERROR] Failed to download image from {img_url}")
+        Args:
+            items: (index, image source) pairs, as from enumerate(output_images)
+            executor: Pool the HEAD requests run on
+
+        Returns:
+            The (index, image source) pairs to download, in download order
+        """
+        def content_length(item: Tuple[int, str]) -> Optional[float]:
+            src = item[1]
+            if not (isinstance(src, str) and src.startswith(("http://", "https://"))):
+                return 0
+            try:
+                response = _head_session.head(src, timeout=_HEAD_TIMEOUT, allow_redirects=True)
+            except requests.RequestException as e:
+                # Slow or failed pre-check: leave it to the download itself
+                logger.debug("HEAD check failed for image %s: %s", item[0]+1, e)
+                return float('inf')
+            if response.status_code in _GONE_STATUSES:
+                logger.warning("Skipping image %s: HTTP %s", item[0]+1, response.status_code)
                 return None
+            # Unknown size (or a refused HEAD) goes last
+            length = response.headers.get("Content-Length")
+            return int(length) if response.ok and length and length.isdigit() else float('inf')
+
+        sizes = executor.map(content_length, items)
+        ranked = [(size, item) for size, item in zip(sizes, items) if size is not None]
+        ranked.sort(key=lambda entry: entry[0])
+        return [item for _, item in ranked]
+
+    def _persist_image(self, src, save_dir: str, index: int, timestamp: str) -> Optional[str]:
+        """
+        Save one generated image into save_dir (an absolute, existing directory).
+
+        Args:
+            src: Image URL, base64 string (optionally a data: URI), raw image bytes,
+                or a PIL Image
+            save_dir: Target directory
+            index: Position in the batch, used in the filename
+            timestamp: Batch timestamp, used in the filename
+
+        Returns:
+            Path of the saved image, or None on failure
+        """
+        path_stem = os.path.join(save_dir, f"modelscope_image_{timestamp}_{index+1}")
+        try:
+            if isinstance(src, str) and src.startswith(("http://", "https://")):
+                logger.info("Downloading image %s from: %s...", index+1, src[:50])
+                filename = download_image(_session, src, path_stem)
+            else:
+                img_bytes = _decode_base64_image(src) if isinstance(src, str) else src
+                extension = sniff_image_extension(img_bytes)
+                if extension:
+                    # Already PNG/JPEG: write the bytes as they are instead of decoding and re-encoding
+                    filename = path_stem + extension
+                    with open(filename, 'wb') as f:
+                        f.write(img_bytes)
+                else:
+                    filename = path_stem + ".png"
+                    img = Image.open(BytesIO(img_bytes)) if isinstance(img_bytes, bytes) else img_bytes
+                    img.save(filename)
+
+            logger.info("Image saved to: %s", filename)
+            return filename
 
         except Exception as e:
-            print(f"[ERROR] Error downloading image {index+1}: {e}")
-            return None
\ No newline at end of file
+            logger.error("Failed to save image %s: %s", index+1, e)
+            return None
@@ -0,0 +1,192 @@
+"""
+Shared HTTP helpers for the AI service implementations.
+"""
+
+import os
+import shutil
+from io import BytesIO
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+from urllib3.util.retry import Retry
+
+# Rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Image formats that are written to disk unchanged; anything else is converted to PNG
+IMAGE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+}
+_URL_EXTENSIONS = {
+    ".png": ".png",
+    ".jpg": ".jpg",
+    ".jpeg": ".jpg",
+}
+
+# Content-Types that say nothing about the format, so the URL extension is used instead
+_GENERIC_CONTENT_TYPES = frozenset(["", "application/octet-stream", "binary/octet-stream"])
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+# Leading bytes of the formats in IMAGE_EXTENSIONS
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+)
+
+
+def make_session(pool_connections: int = 8, pool_maxsize: int = 16, retries: int = 3) -> requests.Session:
+    """
+    Create a keep-alive session with connection pooling.
+
+    Idempotent requests (GET/HEAD) are retried up to `retries` times on RETRY_STATUSES
+    with exponential backoff; POSTs are only retried when the connection could not
+    be established, so a submitted task is never sent twice. Once the retries are
+    used up the last response is returned as is, so callers still see its status
+    code instead of a RetryError.
+
+    Args:
+        pool_connections: Number of host pools to cache
+        pool_maxsize: Maximum connections kept per host
+        retries: Retry budget per request; 0 sends every request exactly once
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=RETRY_STATUSES, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    # Image CDNs may hand out plain http:// URLs, so pool those connections too
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _image_extension(content_type: str, url: str) -> Optional[str]:
+    """
+    File extension for a PNG/JPEG response, from its Content-Type.
+
+    The URL path is only consulted when the Content-Type is missing or generic;
+    a specific other type (e.g. image/webp behind a .png URL) returns None so the
+    image is converted instead of being saved under the wrong extension.
+    """
+    mime_type = content_type.split(";")[0].strip().lower()
+    if mime_type not in _GENERIC_CONTENT_TYPES:
+        return IMAGE_EXTENSIONS.get(mime_type)
+    return _URL_EXTENSIONS.get(os.path.splitext(urlparse(url).path)[1].lower())
+
+
+def sniff_image_extension(data) -> Optional[str]:
+    """
+    File extension for encoded PNG/JPEG bytes, from their header.
+
+    Lets callers write already-encoded images to disk as they are and only
+    fall back to a PIL decode and re-encode for other formats.
+
+    Returns:
+        ".png" or ".jpg", or None if data is not PNG/JPEG bytes
+    """
+    if not isinstance(data, (bytes, bytearray)):
+        return None
+    for signature, extension in _IMAGE_SIGNATURES:
+        if data[:len(signature)] == signature:
+            return extension
+    return None
+
+
+def download_image(session: requests.Session, url: str, path_stem: str, timeout: float = 30) -> str:
+    """
+    Download an image to path_stem plus a matching extension.
+
+    PNG and JPEG responses are streamed straight to disk in COPY_BUFFER_SIZE
+    chunks. Responses without a usable Content-Type or URL extension are
+    sniffed by header, so only other formats are converted to PNG with PIL.
+
+    Args:
+        session: Session to download with
+        url: Image URL
+        path_stem: Absolute target path without extension, in an existing directory
+        timeout: Request timeout in seconds
+
+    Returns:
+        Path of the saved image
+
+    Raises:
+        requests.HTTPError: If the server does not return the image
+    """
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        extension = _image_extension(response.headers.get("Content-Type", ""), url)
+
+        if extension:
+            filename = path_stem + extension
+            response.raw.decode_content = True
+            with open(filename, 'wb', buffering=COPY_BUFFER_SIZE) as f:
+                shutil.copyfileobj(response.raw, f, COPY_BUFFER_SIZE)
+        else:
+            content = response.content
+            extension = sniff_image_extension(content)
+            if extension:
+                # Mislabelled PNG/JPEG, no conversion needed
+                filename = path_stem + extension
+                with open(filename, 'wb') as f:
+                    f.write(content)
+            else:
+                # Unknown format, let PIL convert it
+                from PIL import Image
+                filename = path_stem + ".png"
+                Image.open(BytesIO(content)).save(filename)
+
+    return filename
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    Whether a failed API call is worth retrying: timeouts, dropped connections,
+    and RETRY_STATUSES responses from requests, google-genai or openai.
+    """
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRY_STATUSES
+    # google-genai APIError exposes the HTTP status as .code, openai APIStatusError as .status_code
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+    return status in RETRY_STATUSES
+
+
+# Wrap the network call itself (not the parsing around it) so only transient
+# failures are retried: up to 4 attempts, backing off 0.5s, 1s, 2s ... capped at 8s.
+# Works for both plain and async callables.
+retry_transient = retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential(multiplier=0.5, min=0.5, max=8),
+    retry=retry_if_exception(is_transient_error),
+    reraise=True,
+)
+
+
+def is_retryable_submit_error(exc: BaseException) -> bool:
+    """
+    Whether a failed non-idempotent POST (e.g. submitting a generation task) is
+    safe to send again: only when the request never reached the server, or the
+    server explicitly refused it with 429. Read timeouts and 5xx responses are not
+    retried, as the server may already have accepted the request.
+    """
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.ConnectionError) and not isinstance(exc, requests.Timeout):
+        return True
+    return isinstance(exc, requests.HTTPError) and exc.response is not None and exc.response.status_code == 429
+
+
+# Same backoff as retry_transient, for POSTs that must not create duplicates
+retry_submit = retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential(multiplier=0.5, min=0.5, max=8),
+    retry=retry_if_exception(is_retryable_submit_error),
+    reraise=True,
+)
@@ -0,0 +1,101 @@
+"""
+Staged asyncio pipeline for generating several notes in one run.
+
+Text generation for note N+1 runs while the images of note N are being
+generated, so a batch takes roughly (slowest stage x notes) instead of
+(sum of all stages x notes).
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from services.ai_service import AIService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NoteResult:
+    """Generated assets for one topic; content is empty if text generation failed."""
+
+    topic: str
+    storage_path: Optional[str] = None
+    content: Dict = field(default_factory=dict)
+    image_paths: List[str] = field(default_factory=list)
+
+
+async def generate_notes(
+    ai_service: AIService,
+    topics: List[str],
+    prepare_folder: Callable[[str, Dict], str],
+    num_images: int = 1,
+    text_workers: int = 1,
+    image_workers: int = 2,
+) -> List[NoteResult]:
+    """
+    Generate text and images for several topics.
+
+    Args:
+        ai_service: Service used for both stages
+        topics: Note topics, one note per topic
+        prepare_folder: Called as prepare_folder(topic, content) in a worker thread
+            once the text is ready; creates the storage folder, archives the
+            content and returns the folder path
+        num_images: Number of images per note
+        text_workers: Concurrent text generation calls
+        image_workers: Concurrent image generation calls
+
+    Returns:
+        One NoteResult per topic, in the same order as topics
+    """
+    results = [NoteResult(topic=topic) for topic in topics]
+    topic_queue: asyncio.Queue = asyncio.Queue()
+    text_queue: asyncio.Queue = asyncio.Queue(maxsize=image_workers * 2)
+
+    for index in range(len(topics)):
+        topic_queue.put_nowait(index)
+
+    async def text_worker():
+        while not topic_queue.empty():
+            index = topic_queue.get_nowait()
+            result = results[index]
+            logger.info("Generating text content for: %s", result.topic)
+            try:
+                result.content = await ai_service.agenerate_text_content(result.topic)
+            except Exception as e:
+                # Keep the worker alive for the remaining topics
+                logger.error("Text generation raised for %s: %s", result.topic, e)
+                continue
+            if not result.content:
+                logger.error("Failed to generate text content for: %s", result.topic)
+                continue
+            await text_queue.put(index)
+
+    async def image_worker():
+        while (index := await text_queue.get()) is not None:
+            result = results[index]
+            content = result.content
+            try:
+                result.storage_path = await asyncio.to_thread(prepare_folder, result.topic, content)
+                logger.info("Generating images for: %s", result.topic)
+                result.image_paths = await ai_service.agenerate_images(
+                    text_content=content['content'],
+                    save_dir=result.storage_path,
+                    num_images=num_images,
+                    image_prompt=content.get('image_prompt'),
+                )
+            except Exception as e:
+                # Keep the worker alive for the remaining notes
+                logger.error("Failed to generate images for %s: %s", result.topic, e)
+
+    image_tasks = [asyncio.create_task(image_worker()) for _ in range(image_workers)]
+    await asyncio.gather(*(text_worker() for _ in range(text_workers)))
+
+    # Text stage finished: one sentinel per image worker
+    for _ in image_tasks:
+        await text_queue.put(None)
+    await asyncio.gather(*image_tasks)
+
+    return results
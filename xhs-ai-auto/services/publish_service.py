@@ -1,6 +1,30 @@
-import requests
-import json
+import atexit
+import logging
+
+import httpx
+
 from config import settings
+from services import fast_json
+
+logger = logging.getLogger(__name__)
+
+# One keep-alive client for all publish calls, so publishing several notes
+# reuses the connection to the MCP service instead of reconnecting each time
+_CLIENT = httpx.Client(timeout=180, headers={"Content-Type": "application/json"})
+atexit.register(_CLIENT.close)
+
+# Whole MCP result messages (lower-cased, trailing punctuation removed) that mark a
+# successful publish. Compared exactly, never as substrings, so messages such as
+# "Publish unsuccessful" or "not published" are not mistaken for success.
+_SUCCESS_MESSAGES = frozenset(["成功", "发布成功", "success", "published"])
+
+# Static part of the MCP tools/call request; publish_note only adds the arguments
+_MCP_TEMPLATE = {
+    "jsonrpc": "2.0",
+    "method": "tools/call",
+    "id": 1,
+}
+_PUBLISH_TOOL = "publish_content"
 
 def publish_note(title: str, content: str, tags: list, local_image_paths: list[str]) -> bool:
     """
@@ -15,94 +39,94 @@ def publish_note(title: str, content: str, tags: list, local_image_paths: list[s
     Returns:
         True if publishing was successful, False otherwise.
     """
-    mcp_url = f"{settings.XHS_MCP_BASE_URL}/mcp"  # Use /mcp endpoint for MCP protocol
+    mcp_url = f"{settings.xhs_mcp_base_url}/mcp"  # Use /mcp endpoint for MCP protocol
 
     if not local_image_paths:
-        print("Error: No local image paths provided. Aborting publish.")
+        logger.error("No local image paths provided. Aborting publish.")
         return False
 
     # Construct the MCP request
     mcp_request = {
-        "jsonrpc": "2.0",
-        "method": "tools/call",
+        **_MCP_TEMPLATE,
         "params": {
-            "name": "publish_content",
+            "name": _PUBLISH_TOOL,
             "arguments": {
                 "title": title[:20],  # Xiaohongshu title limit is 20 characters
                 "content": content,
                 "images": local_image_paths  # Changed from image_paths to images
             }
         },
-        "id": 1
     }
 
-    headers = {"Content-Type": "application/json"}
-
     try:
-        print("\nSending MCP request to xiaohongshu-mcp service...")
-        print(f"Title: {title[:20]}")
-        print(f"Content length: {len(content)} characters")
-        print(f"Images: {len(local_image_paths)} files")
+        logger.info("Sending MCP request to xiaohongshu-mcp service...")
+        logger.info("Title: %s", title[:20])
+        logger.info("Content length: %s characters", len(content))
+        logger.info("Images: %s files", len(local_image_paths))
 
-        response = requests.post(mcp_url, headers=headers, json=mcp_request, timeout=180)
+        response = _CLIENT.post(mcp_url, content=fast_json.dumps(mcp_request))
         response.raise_for_status()
-        response_data = response.json()
+        response_data = fast_json.loads(response.content)
 
         # Check MCP response
         if "error" in response_data:
             error = response_data["error"]
-            print(f"MCP Error: {error.get('message', 'Unknown error')}")
+            logger.error("MCP Error: %s", error.get('message', 'Unknown error'))
             if "data" in error:
-                print(f"Error details: {error['data']}")
+                logger.error("Error details: %s", error['data'])
             return False
 
         if "result" in response_data:
             result = response_data["result"]
-            print(f"[DEBUG] MCP Result: {result}")
+            logger.debug("MCP Result: %s", result)
 
             # Check if the result indicates success
             if isinstance(result, dict):
                 # Check for various success indicators
+                message = str(result.get("message", "")).strip().rstrip("!！。.").lower()
                 if (result.get("success") or
-                    "成功" in str(result.get("message", "")) or
                     result.get("status") == "success" or
+                    message in _SUCCESS_MESSAGES or
                     # If there's no error field and no failure indicators, assume success
                     (not result.get("error") and not result.get("failed"))):
-                    print("Successfully published note to Xiaohongshu!")
+                    logger.info("Successfully published note to Xiaohongshu!")
                     if "message" in result:
-                        print(f"Response: {result['message']}")
+                        logger.info("Response: %s", result['message'])
                     return True
                 else:
-                    print(f"Failed to publish: {result.get('message', result.get('error', 'Unknown error'))}")
+                    logger.error("Failed to publish: %s", result.get('message', result.get('error', 'Unknown error')))
                     return False
             elif isinstance(result, list):
                 # If result is a list, check if it contains success info
-                print(f"MCP Response (list): {result}")
+                logger.info("MCP Response (list): %s", result)
                 # For list responses, assume success if not empty
                 return len(result) > 0
             else:
                 # For other formats (string, etc), assume success if no error indicators
                 result_str = str(result).lower()
                 if "error" in result_str or "failed" in result_str:
-                    print(f"Failed to publish: {result}")
+                    logger.error("Failed to publish: %s", result)
                     return False
-                print(f"MCP Response: {result}")
+                logger.info("MCP Response: %s", result)
                 return True  # Assume success if no error indicators
         else:
-            print(f"Unexpected MCP response format: {response_data}")
+            logger.error("Unexpected MCP response format: %s", response_data)
             return False
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error calling xiaohongshu-mcp service: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response status: {e.response.status_code}")
-            print(f"Response body: {e.response.text[:500]}")  # Print first 500 chars
+    except httpx.HTTPStatusError as e:
+        logger.error("Error calling xiaohongshu-mcp service: %s", e)
+        logger.error("Response status: %s", e.response.status_code)
+        logger.error("Response body: %.500s", e.response.text)  # First 500 chars
+        return False
+    except httpx.HTTPError as e:
+        logger.error("Error calling xiaohongshu-mcp service: %s", e)
         return False
     except Exception as e:
-        print(f"An unexpected error occurred during publishing: {e}")
+        logger.error("An unexpected error occurred during publishing: %s", e)
         return False
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
     # This block is for direct testing of this module.
     # NOTE: To run this test, you need a pre-existing image file.
     # The main.py workflow is the intended way to use the full system.
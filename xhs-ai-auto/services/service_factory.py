@@ -3,94 +3,129 @@ Service factory for creating AI service instances.
 Supports dynamic switching between different AI providers.
 """
 
-from typing import Optional
+import logging
+import functools
+import importlib
+import threading
+import time
+from typing import Dict, Optional
 from config import settings
-from services.ai_service import AIService
+from services.ai_service import AIService, get_service_class
 
+logger = logging.getLogger(__name__)
 
+# Provider name -> module that registers it. Modules are only imported when selected.
+_PROVIDER_MODULES: Dict[str, str] = {
+    "google": "services.google_service",
+    "modelscope": "services.modelscope_service",
+    "dashscope": "services.dashscope_service",
+}
+
+# Provider to try when the configured one is not available
+_FALLBACKS: Dict[str, str] = {
+    "google": "modelscope",
+    "modelscope": "dashscope",
+    "dashscope": "google",
+}
+
+# Seconds get_available_services waits for the provider checks
+_PROBE_TIMEOUT = 3.0
+
+
+def _create_service(provider: str) -> Optional[AIService]:
+    """
+    Import the provider's module (registering its class) and instantiate it.
+
+    Returns:
+        The service, or None if the provider's SDK is not installed
+    """
+    try:
+        importlib.import_module(_PROVIDER_MODULES[provider])
+    except ImportError as e:
+        logger.warning("%s service unavailable, missing dependency: %s", provider, e)
+        return None
+    return get_service_class(provider)()
+
+
+@functools.lru_cache(maxsize=1)
 def get_ai_service() -> AIService:
     """
     Get an AI service instance based on configuration.
 
+    The service is created once per process; repeated calls return the same
+    instance without importing or probing the provider again.
+
     Returns:
         AIService instance based on AI_PROVIDER setting
 
     Raises:
         ValueError: If the specified provider is not supported
     """
-    provider = settings.AI_PROVIDER.lower()
-    print(f"[INFO] Initializing AI service: {provider}")
-
-    if provider == "google":
-        from services.google_service import GoogleAIService
-        service = GoogleAIService()
-        if service.is_available():
-            return service
-        else:
-            print("[WARNING] Google service not available, trying fallback...")
-            provider = "modelscope"  # Fallback to ModelScope
-
-    elif provider == "modelscope":
-        from services.modelscope_service import ModelScopeAIService
-        service = ModelScopeAIService()
-        if service.is_available():
-            return service
-        else:
-            print("[WARNING] ModelScope service not available, trying DashScope...")
-            provider = "dashscope"  # Fallback to DashScope
-
-    elif provider == "dashscope":
-        from services.dashscope_service import DashScopeAIService
-        service = DashScopeAIService()
-        if service.is_available():
-            return service
-        else:
-            print("[ERROR] DashScope service not available")
-            # Try to fall back to Google as last resort
-            from services.google_service import GoogleAIService
-            service = GoogleAIService()
-            if service.is_available():
-                print("[INFO] Falling back to Google service")
-                return service
+    provider = settings.ai_provider.lower()
+    logger.info("Initializing AI service: %s", provider)
+
+    if provider not in _PROVIDER_MODULES:
+        raise ValueError(f"Unsupported AI provider: {provider}")
+
+    service = _create_service(provider)
+    if service and service.is_available():
+        return service
+
+    fallback = _FALLBACKS[provider]
+    logger.warning("%s service not available, trying %s...", provider, fallback)
+    service = _create_service(fallback)
+    if service and service.is_available():
+        logger.info("Falling back to %s service", fallback)
+        return service
 
     # If we get here, no service is available
     raise ValueError(f"No AI service available. Please check your configuration.")
 
 
+def _probe(provider: str) -> bool:
+    """Create the provider's service and check whether it is available."""
+    service = _create_service(provider)
+    return bool(service and service.is_available())
+
+
 def get_available_services() -> list:
     """
     Get a list of all available AI services.
 
+    Providers are probed concurrently; one that does not answer within
+    _PROBE_TIMEOUT seconds is reported as unavailable.
+
     Returns:
         List of available service names
     """
-    available = []
+    results: Dict[str, object] = {}
+
+    def run(provider: str) -> None:
+        try:
+            results[provider] = _probe(provider)
+        except Exception as e:
+            results[provider] = e
+
+    # Daemon threads, so a provider that is still hanging neither blocks the listing
+    # nor keeps the interpreter alive at exit (executor workers are joined at exit)
+    threads = [
+        threading.Thread(target=run, args=(provider,), name=f"probe-{provider}", daemon=True)
+        for provider in _PROVIDER_MODULES
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + _PROBE_TIMEOUT
+    for thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0))
 
-    # Check Google
-    try:
-        from services.google_service import GoogleAIService
-        service = GoogleAIService()
-        if service.is_available():
-            available.append("google")
-    except ImportError:
-        pass
-
-    # Check ModelScope
-    try:
-        from services.modelscope_service import ModelScopeAIService
-        service = ModelScopeAIService()
-        if service.is_available():
-            available.append("modelscope")
-    except ImportError:
-        pass
-
-    # Check DashScope
-    try:
-        from services.dashscope_service import DashScopeAIService
-        service = DashScopeAIService()
-        if service.is_available():
-            available.append("dashscope")
-    except ImportError:
-        pass
-
-    return available
\ No newline at end of file
+    available = []
+    for provider in _PROVIDER_MODULES:
+        result = results.get(provider)
+        if provider not in results:
+            logger.warning("%s availability check timed out", provider)
+        elif isinstance(result, Exception):
+            logger.warning("%s availability check failed: %s", provider, result)
+        elif result:
+            available.append(provider)
+
+    return available